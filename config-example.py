@@ -14,5 +14,17 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 # Куки (оставляем пустыми - попробуем без них)
 COOKIES = {}
 
+# Сколько ID отправленных заказов хранить в памяти (старые вытесняются, память не растёт)
+SENT_ORDERS_LIMIT = 10000
+
+# Webhook вместо long-polling (простая версия бота): публичный HTTPS адрес и локальный порт.
+# Пустой WEBHOOK_URL - обычный long-polling
+WEBHOOK_URL = ""  # Например "https://example.com"
+WEBHOOK_PORT = 8443
+
+# Объединять уведомления в общие сообщения, когда новых заказов много (простая версия бота).
+# По умолчанию выключено: каждый заказ отдельным сообщением
+BATCH_NOTIFICATIONS = False
+
 # Настройки логирования
 DEBUG_MODE = False  # Включить детальные логи 
\ No newline at end of file
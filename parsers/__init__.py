@@ -5,5 +5,6 @@
 from .freelancespace_parser_simple import FreelanceSpaceParserSimple
 from .fl_parser import FLParser
 from .combined_parser import CombinedParser
+from .models import Order
 
-__all__ = ['FreelanceSpaceParserSimple', 'FLParser', 'CombinedParser'] 
\ No newline at end of file
+__all__ = ['FreelanceSpaceParserSimple', 'FLParser', 'CombinedParser', 'Order'] 
\ No newline at end of file
@@ -6,131 +6,190 @@
 """
 
 import asyncio
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
+import aiohttp
 from datetime import datetime
 
-from .freelancespace_parser_simple import FreelanceSpaceParserSimple
+from .freelancespace_parser_simple import FreelanceSpaceParserSimple, SOURCE as FREELANCESPACE_SOURCE
 from .fl_parser import FLParser
+from .models import Order
+from .sent_orders import SentOrdersCache, order_key
+from .timeparse import time_to_minutes
+
+# Источники объединённого парсера (значения поля 'source' заказов)
+SOURCES = (FREELANCESPACE_SOURCE, 'FL.ru')
 
 class CombinedParser:
-    def __init__(self, user_agent: str, cookies: dict = None):
-        """Инициализация объединённого парсера"""
+    def __init__(self, user_agent: str, cookies: dict = None, session: aiohttp.ClientSession = None):
+        """
+        Инициализация объединённого парсера
+        
+        Args:
+            user_agent: User-Agent для запросов
+            cookies: Куки для авторизации
+            session: Общая aiohttp сессия приложения (можно передать позже через parser.session)
+        """
         self.user_agent = user_agent
         self.cookies = cookies or {}
         
         # Инициализация парсеров
-        self.freelancespace_parser = FreelanceSpaceParserSimple(user_agent, cookies)
-        self.fl_parser = FLParser(user_agent, cookies)
+        self.freelancespace_parser = FreelanceSpaceParserSimple(user_agent, cookies, session=session)
+        self.fl_parser = FLParser(user_agent, cookies, session=session)
         
-        # Настройка логирования
-        logging.basicConfig(level=logging.INFO)
+        # Логгер модуля (обработчики настраиваются один раз в точке входа приложения)
         self.logger = logging.getLogger(__name__)
         
-        # Общее хранилище отправленных заказов
-        self.sent_orders = set()
+        # Общее хранилище отправленных заказов (ограниченного размера)
+        self.sent_orders = SentOrdersCache()
+        
+        # Отправленные публикации "источник|название|цена" для отсева кросс-постов между площадками
+        self.sent_posts = SentOrdersCache()
+        
+        # Снимок get_sources_info(): пересчитывается только после изменения хранилищ
+        self._stats_cache = None
+        self._stats_dirty = True
+    
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        """Общая aiohttp сессия, через которую ходят оба парсера"""
+        return self.fl_parser.session
+    
+    @session.setter
+    def session(self, session: Optional[aiohttp.ClientSession]):
+        self.freelancespace_parser.session = session
+        self.fl_parser.session = session
+    
+    def get_new_orders(self, pages: int = 3) -> List[Order]:
+        """
+        Получение новых заказов со всех источников (синхронная обёртка над aget_new_orders)
+        """
+        return asyncio.run(self.aget_new_orders(pages))
     
-    def get_new_orders(self, pages: int = 3) -> List[Dict]:
+    async def aget_new_orders(self, pages: int = 3) -> List[Order]:
         """
-        Получение новых заказов со всех источников
+        Получение новых заказов со всех источников (источники парсятся параллельно)
         """
-        self.logger.info(f"🚀 Начинаю объединённый парсинг ({pages} страниц)...")
+        self.logger.info("🚀 Начинаю объединённый парсинг (%d страниц)...", pages)
         start_time = datetime.now()
         
-        all_orders = []
+        # Парсинг FreelanceSpace.ru и FL.ru одновременно
+        self.logger.info("📍 Парсинг FreelanceSpace.ru и FL.ru...")
+        freelancespace_orders, fl_orders = await asyncio.gather(
+            self.get_freelancespace_orders(pages),
+            self.get_fl_orders(pages),
+            return_exceptions=True
+        )
         
-        try:
-            # Парсинг FreelanceSpace.ru
-            self.logger.info("📍 Парсинг FreelanceSpace.ru...")
-            freelancespace_orders = self.freelancespace_parser.get_new_orders(pages)
-            all_orders.extend(freelancespace_orders)
-            self.logger.info(f"✅ FreelanceSpace.ru: {len(freelancespace_orders)} новых заказов")
-            
-        except Exception as e:
-            self.logger.error(f"❌ Ошибка парсинга FreelanceSpace.ru: {str(e)}")
+        sorted_orders = self.merge_orders(freelancespace_orders, fl_orders)
         
-        try:
-            # Парсинг FL.ru
-            self.logger.info("📍 Парсинг FL.ru...")
-            fl_orders = self.fl_parser.get_new_orders(pages)
-            all_orders.extend(fl_orders)
-            self.logger.info(f"✅ FL.ru: {len(fl_orders)} новых заказов")
+        end_time = datetime.now()
+        duration = (end_time - start_time).total_seconds()
+        
+        self.logger.info("⚡ Объединённый парсинг завершён за %.1fс", duration)
+        return sorted_orders
+    
+    async def get_freelancespace_orders(self, pages: int = 3) -> List[Dict]:
+        """Новые заказы с FreelanceSpace.ru"""
+        return await self.freelancespace_parser.aget_new_orders(pages)
+    
+    async def get_fl_orders(self, pages: int = 3) -> List[Dict]:
+        """Новые заказы с FL.ru"""
+        return await self.fl_parser._aget_new_orders(pages)
+    
+    def merge_orders(self, freelancespace_orders, fl_orders) -> List[Order]:
+        """
+        Объединение результатов источников
+        
+        Args:
+            freelancespace_orders: Заказы FreelanceSpace.ru или исключение (результат asyncio.gather)
+            fl_orders: Заказы FL.ru или исключение
             
-        except Exception as e:
-            self.logger.error(f"❌ Ошибка парсинга FL.ru: {str(e)}")
+        Returns:
+            Уникальные новые заказы (Order), отсортированные по времени (самые новые в конце)
+        """
+        all_orders = []
         
-        # Фильтрация дубликатов и уже отправленных
-        unique_orders = self._filter_unique_orders(all_orders)
+        # Источники и фильтр ниже пополнили хранилища отправленных заказов
+        self._stats_dirty = True
         
-        # Сортировка по времени (самые новые в конце)
-        sorted_orders = self._sort_orders_by_time(unique_orders)
+        if isinstance(freelancespace_orders, Exception):
+            self.logger.error("❌ Ошибка парсинга FreelanceSpace.ru: %s", freelancespace_orders)
+        else:
+            all_orders.extend(freelancespace_orders)
+            self.logger.info("✅ FreelanceSpace.ru: %d новых заказов", len(freelancespace_orders))
         
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        if isinstance(fl_orders, Exception):
+            self.logger.error("❌ Ошибка парсинга FL.ru: %s", fl_orders)
+        else:
+            all_orders.extend(fl_orders)
+            self.logger.info("✅ FL.ru: %d новых заказов", len(fl_orders))
         
-        self.logger.info(f"⚡ Объединённый парсинг завершён за {duration:.1f}с")
-        self.logger.info(f"📊 Всего найдено: {len(all_orders)}, уникальных новых: {len(sorted_orders)}")
+        # Фильтрация дубликатов и уже отправленных + сортировка по времени (самые новые в конце)
+        sorted_orders = self._filter_and_sort_orders(all_orders)
         
+        self.logger.info("📊 Всего найдено: %d, уникальных новых: %d", len(all_orders), len(sorted_orders))
         return sorted_orders
     
-    def _filter_unique_orders(self, orders: List[Dict]) -> List[Dict]:
-        """Фильтрация уникальных заказов"""
-        unique_orders = []
-        seen_ids = set()
-        
-        for order in orders:
-            order_id = order.get('id')
-            if order_id and order_id not in seen_ids and order_id not in self.sent_orders:
-                unique_orders.append(order)
-                seen_ids.add(order_id)
-                self.sent_orders.add(order_id)
-        
-        return unique_orders
-    
-    def _sort_orders_by_time(self, orders: List[Dict]) -> List[Dict]:
+    def _filter_and_sort_orders(self, orders: List[Dict]) -> List[Order]:
         """
-        Сортировка заказов по времени публикации (самые старые сначала, самые новые в конце)
+        Фильтрация уникальных заказов и сортировка по времени публикации за один проход
+        (самые старые сначала, самые новые в конце)
+        
+        Заказ идентифицируется по URL (ID - если ссылки нет): URL однозначен между источниками,
+        а ID разных площадок могут совпасть. URL хэшируется в int один раз на заказ.
+        Словари парсеров превращаются в Order только для прошедших фильтр заказов.
         """
-        def time_to_minutes(time_str: str) -> int:
-            """Преобразование времени в минуты для сортировки"""
-            if not time_str or time_str == "Недавно":
-                return 0  # Самые новые - 0 минут
+        seen_keys = set()
+        keyed = []
+        
+        for i, order in enumerate(orders):
+            raw_key = order.get('url') or order.get('id')
+            if not raw_key:
+                continue
             
-            time_str = time_str.lower()
+            key = order_key(raw_key)
+            if key in seen_keys or key in self.sent_orders:
+                continue
             
-            # Извлекаем число из строки
-            import re
-            numbers = re.findall(r'\d+', time_str)
-            if not numbers:
-                return 0
-                
-            num = int(numbers[0])
+            seen_keys.add(key)
+            self.sent_orders.add(key)
             
-            # Преобразуем в минуты
-            if 'секунд' in time_str:
-                return max(1, num // 60)  # Секунды -> минуты (минимум 1)
-            elif 'минут' in time_str:
-                return num
-            elif 'час' in time_str:
-                return num * 60
-            elif 'день' in time_str or 'дня' in time_str or 'дней' in time_str:
-                return num * 24 * 60
-            elif 'недел' in time_str:
-                return num * 7 * 24 * 60
-            elif 'месяц' in time_str:
-                return num * 30 * 24 * 60
-            else:
-                return 0  # Неизвестный формат = самые новые
-        
-        try:
-            # Сортируем по убыванию времени (самые старые сначала, самые новые в конце)
-            sorted_orders = sorted(orders, key=lambda x: time_to_minutes(x.get('published', '')), reverse=True)
-            return sorted_orders
+            if self._is_cross_post(order):
+                self.logger.debug("🔁 Кросс-пост пропущен: %s", order.get('url'))
+                continue
             
-        except Exception as e:
-            self.logger.error(f"❌ Ошибка сортировки по времени: {str(e)}")
-            # Если сортировка не удалась, возвращаем как есть
-            return orders
+            # Ключ сортировки считаем сразу, пока заказ под рукой.
+            # -i сохраняет исходный порядок заказов с одинаковым временем и не даёт сравнивать словари
+            keyed.append((time_to_minutes(order.get('published', '')), -i, order))
+        
+        # Сортируем по убыванию времени (самые старые сначала, самые новые в конце)
+        keyed.sort(reverse=True)
+        return [Order.from_dict(order) for _, _, order in keyed]
+    
+    def _is_cross_post(self, order: Dict) -> bool:
+        """
+        Проверка, был ли тот же заказ (название + цена) уже отправлен с другой площадки
+        
+        Совпадения внутри одного источника не считаются дублями: там разные заказы
+        с одинаковыми названиями встречаются часто. Название сравнивается без регистра
+        и лишних пробелов, цена - только по цифрам ("10 000 ₽" и "10000 руб" совпадают).
+        """
+        title = ' '.join(order.get('title', '').lower().split())
+        if not title:
+            return False
+        
+        price = ''.join(filter(str.isdigit, order.get('price', '')))
+        source = order.get('source', '')
+        post = f"{title}|{price}"
+        
+        if any(f"{other}|{post}" in self.sent_posts for other in SOURCES if other != source):
+            return True
+        
+        # Запоминаются только отправляемые публикации, чтобы пропущенная копия не блокировала
+        # следующие заказы своего источника
+        self.sent_posts.add(f"{source}|{post}")
+        return False
     
     @property
     def total_sent_orders(self) -> int:
@@ -138,15 +197,19 @@ class CombinedParser:
         return len(self.sent_orders)
     
     def get_sources_info(self) -> Dict:
-        """Информация об источниках"""
-        return {
-            'freelancespace': {
-                'name': 'FreelanceSpace.ru',
-                'sent_orders': len(self.freelancespace_parser.sent_orders)
-            },
-            'fl': {
-                'name': 'FL.ru',
-                'sent_orders': len(self.fl_parser.sent_orders)
-            },
-            'total_sent': self.total_sent_orders
-        } 
\ No newline at end of file
+        """Информация об источниках (кэшируется до следующего парсинга)"""
+        if self._stats_dirty or self._stats_cache is None:
+            self._stats_cache = {
+                'freelancespace': {
+                    'name': FREELANCESPACE_SOURCE,
+                    'sent_orders': len(self.freelancespace_parser.sent_orders)
+                },
+                'fl': {
+                    'name': 'FL.ru',
+                    'sent_orders': len(self.fl_parser.sent_orders)
+                },
+                'total_sent': self.total_sent_orders
+            }
+            self._stats_dirty = False
+        
+        return self._stats_cache 
\ No newline at end of file
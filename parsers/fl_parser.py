@@ -2,44 +2,163 @@
 # -*- coding: utf-8 -*-
 """
 Парсер заказов с FL.ru
-Простая версия без базы данных с переходом по индивидуальным ссылкам
+Простая версия без базы данных: данные берутся из карточек на странице списка,
+переход по индивидуальным ссылкам - опционально (fetch_details=True)
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+import aiohttp
+from lxml import html as lxml_html
+from lxml.etree import XPath, ParserError, XMLSyntaxError
 import re
-import time
 from datetime import datetime
-from typing import List, Dict, Set
+from typing import List, Dict, Iterator, Optional, Tuple
 import logging
 
+from .sent_orders import SentOrdersCache
+
+# Максимум одновременных запросов к страницам заказов FL.ru
+DETAIL_CONCURRENCY = 16
+
+# Бюджет, заказчик и дата публикации ищутся одним проходом по тексту страницы:
+# все шаблоны объединены в одно выражение с именованными группами
+_FIELDS_RE = re.compile(
+    r'(?P<budget>Бюджет:\s*(?P<budget_value>[^\n\r]+))'
+    r'|(?P<negotiable>по договор[её]нности)'
+    r'|(?P<customer>(?:Заказчик|Автор:)\s*(?P<customer_value>[^\n\r]+))'
+    r'|(?P<pub>Опубликован:\s*(?P<pub_value>[^\n\r]+))'
+    r'|(?P<placed>Размещен:\s*[^\n\r]+)'
+    r'|(?P<date>\d{1,2}[./]\d{1,2}[./]\d{4})'
+    r'|(?P<rel>\d+\s*(?:минут[уы]?|час[ова]?|дн[яей]+)\s*назад)'
+    r'|(?P<budget_rub>(?P<rub_value>\d+[\s\d,]*)\s*руб)',
+    re.IGNORECASE
+)
+
+# Сколько байт индивидуальной страницы читать: все извлекаемые поля находятся
+# в начале страницы, комментарии и сайдбар не нужны
+DETAIL_MAX_BYTES = 64 * 1024
+
+# Размер порции при чтении страницы списка и начало карточки заказа в сыром HTML.
+# После "b-post" обязателен пробел или кавычка: иначе внутренние классы (b-post__price),
+# оборванные на границе порции сразу после "b-post", считались бы новой карточкой
+LISTING_CHUNK_SIZE = 16 * 1024
+_CARD_START_RE = re.compile(rb'<div[^>]*\bclass="[^"]*\bb-post(?=[\s"])')
+# Сколько байт с конца прочитанного пересматривать заново: начало карточки могло оборваться на границе порции
+_CARD_START_OVERLAP = 1024
+
+# Флаги найденных полей для раннего выхода из _scan_page_fields
+_PRICE_FOUND, _AUTHOR_FOUND, _PUBLISHED_FOUND = 1, 2, 4
+_ALL_FOUND = _PRICE_FOUND | _AUTHOR_FOUND | _PUBLISHED_FOUND
+
+def _class_xpath(*names: str) -> str:
+    """XPath условие "у элемента есть хотя бы один из классов" (как CSS селектор .a, .b)"""
+    return ' or '.join(
+        f'contains(concat(" ", normalize-space(@class), " "), " {name} ")' for name in names
+    )
+
+# Предкомпилированные XPath выражения: обход дерева выполняется в libxml2, а не в Python
+
+# Ссылка на заказ (ссылки на категории отсекаются сразу)
+_PROJECT_LINK = 'a[contains(@href, "/projects/")][not(contains(@href, "category"))]'
+
+# Ссылки на заказы в заголовках и сами заголовки (если разметка карточек не распознана)
+_XP_PROJECT_HREFS = XPath(f'//h2//{_PROJECT_LINK}/@href', smart_strings=False)
+_XP_PROJECT_HEADINGS = XPath(f'//h2//{_PROJECT_LINK}/ancestor::h2[1]')
+
+# Карточки заказов на странице списка и поля карточки
+_XP_CARDS = XPath(f'//div[{_class_xpath("b-post")}]')
+_XP_CARD_LINK = XPath(f'(descendant::{_PROJECT_LINK})[1]')
+_XP_CARD_PRICE = XPath(f'(descendant::*[{_class_xpath("b-post__price")}])[1]')
+_XP_CARD_USER = XPath(f'(descendant::*[{_class_xpath("b-post__user")}])[1]')
+_XP_CARD_TIME = XPath(f'(descendant::*[{_class_xpath("b-post__time")}])[1]')
+_XP_CARD_TEXT = XPath(f'(descendant::*[{_class_xpath("b-post__txt", "b-post__body")}])[1]')
+
+# Индивидуальная страница заказа
+_XP_H1 = XPath('(//h1)[1]')
+_XP_TITLE = XPath('(//title)[1]')
+# Блок заказа в порядке приоритета (меню, сайдбар и футер страницы в поиск полей не попадают)
+_XP_CONTENT = (
+    XPath('(//*[@id="projectp"])[1]'),
+    XPath(f'(//div[{_class_xpath("b-layout__txt")}])[1]'),
+    XPath('(//body)[1]'),
+)
+# Текстовые узлы блока без содержимого скриптов и стилей
+_XP_TEXT_NODES = XPath('descendant-or-self::text()[not(parent::script or parent::style)]',
+                       smart_strings=False)
+
+def _parse_html(html: bytes, encoding: str = None) -> Optional[lxml_html.HtmlElement]:
+    """
+    Разбор HTML в кодировке из заголовка ответа (UTF-8, если сервер её не указал)
+    
+    Returns:
+        Корень HTML дерева или None для пустого или нечитаемого документа
+    """
+    try:
+        return lxml_html.document_fromstring(html, parser=lxml_html.HTMLParser(encoding=encoding or 'utf-8'))
+    except (ParserError, XMLSyntaxError, ValueError):
+        return None
+
+def _first(xpath: XPath, node):
+    """Первый результат XPath выражения или None"""
+    found = xpath(node)
+    return found[0] if found else None
+
+def _single_string(element) -> Optional[str]:
+    """
+    Текст элемента, состоящего из одной строки (семантика .string из BeautifulSoup):
+    элемент без дочерних узлов или с единственным потомком, у которого тоже одна строка
+    """
+    while len(element) == 1 and not element.text and not element[0].tail:
+        element = element[0]
+    return element.text if len(element) == 0 else None
+
+# Маркеры футера и системного текста (одна проверка без копии text.lower())
+_FOOTER_RE = re.compile(r'сведения об ооо|fl\.ru|copyright|©', re.IGNORECASE)
+
+_PROJECT_ID_RE = re.compile(r'/projects/(\d+)/')
+_WS_RE = re.compile(r'\s+')
+
 class FLParser:
-    def __init__(self, user_agent: str, cookies: dict = None):
-        """Инициализация парсера FL.ru"""
+    def __init__(self, user_agent: str, cookies: dict = None, fetch_details: bool = False,
+                 session: aiohttp.ClientSession = None):
+        """
+        Инициализация парсера FL.ru
+        
+        Args:
+            user_agent: User-Agent для запросов
+            cookies: Куки для авторизации
+            fetch_details: Загружать индивидуальную страницу каждого заказа (полное описание,
+                           но +1 HTTP запрос на заказ)
+            session: Общая aiohttp сессия приложения (без неё сессия создаётся на каждый парсинг)
+        """
         self.user_agent = user_agent
+        self.fetch_details = fetch_details
         self.cookies = cookies or {}
-        self.sent_orders: Set[str] = set()  # Хранение отправленных заказов в памяти
+        self.session = session
+        self.sent_orders = SentOrdersCache()  # Хранение отправленных заказов в памяти (ограниченного размера)
         self.base_url = "https://www.fl.ru"
         
-        # Настройка логирования
-        logging.basicConfig(level=logging.INFO)
+        # Логгер модуля (обработчики настраиваются один раз в точке входа приложения)
         self.logger = logging.getLogger(__name__)
         
-        # Создание сессии
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Заголовки для aiohttp сессии
+        self.headers = {
             'User-Agent': self.user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'ru-RU,ru;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-        })
-        
-        if self.cookies:
-            self.session.cookies.update(self.cookies)
+        }
     
     def get_new_orders(self, pages: int = 3) -> List[Dict]:
+        """
+        Получение новых заказов с FL.ru (синхронная обёртка над _aget_new_orders)
+        """
+        return asyncio.run(self._aget_new_orders(pages))
+    
+    async def _aget_new_orders(self, pages: int = 3) -> List[Dict]:
         """
         Получение новых заказов с FL.ru (только первые 5 заказов)
         """
@@ -48,7 +167,8 @@ class FLParser:
         
         # Парсим только первую страницу, но ограничиваем 5 заказами
         try:
-            page_orders = self._parse_page(1, max_orders=5)
+            async with self._session_scope() as session:
+                page_orders = await self._parse_page(session, 1, max_orders=5)
             all_orders.extend(page_orders)
             self.logger.info(f"📄 Первая страница FL.ru: найдено {len(page_orders)} заказов (лимит: 5)")
             
@@ -66,174 +186,249 @@ class FLParser:
         self.logger.info(f"✅ FL.ru: обработано {len(all_orders)} заказов, новых: {len(new_orders)}")
         return new_orders
     
-    def _parse_page(self, page: int, max_orders: int = None) -> List[Dict]:
+    @asynccontextmanager
+    async def _session_scope(self):
+        """Общая сессия, если она передана, иначе временная сессия на один парсинг"""
+        if self.session is not None:
+            yield self.session
+            return
+        
+        async with aiohttp.ClientSession(headers=self.headers, cookies=self.cookies) as session:
+            yield session
+    
+    async def _afetch(self, session: aiohttp.ClientSession, url: str, sem: asyncio.Semaphore,
+                      max_bytes: int = None) -> Tuple[bytes, Optional[str]]:
+        """
+        Загрузка страницы с ограничением числа одновременных запросов
+        
+        Args:
+            max_bytes: Читать не больше указанного числа байт тела ответа (None - всё тело)
+            
+        Returns:
+            Байты тела и кодировка из заголовка ответа (декодирует парсер)
+        """
+        async with sem, session.get(url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            response.raise_for_status()
+            if max_bytes is None:
+                return await response.read(), response.charset
+            
+            body = bytearray()
+            while len(body) < max_bytes:
+                chunk = await response.content.read(max_bytes - len(body))
+                if not chunk:
+                    break
+                body += chunk
+            return bytes(body), response.charset
+    
+    async def _parse_page(self, session: aiohttp.ClientSession, page: int, max_orders: int = None) -> List[Dict]:
         """Парсинг одной страницы заказов"""
         url = f"{self.base_url}/projects/category/programmirovanie/"
         if page > 1:
             url += f"?page={page}"
         
         try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            async with session.get(url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
+                response.raise_for_status()
+                html = await self._read_listing(response, max_orders)
+                encoding = response.charset
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            orders = []
+            # Разбор HTML - CPU работа: выполняется в потоке, чтобы не блокировать цикл событий
+            # (команды бота и отправка уведомлений обрабатываются во время парсинга)
+            root = await asyncio.to_thread(_parse_html, html, encoding)
+            if root is None:
+                self.logger.info(f"🚫 Страница {page}: пустой HTML")
+                return []
             
-            # Ищем блоки с заказами - h2 элементы с ссылками на проекты
-            h2_elements = soup.find_all('h2')
+            # Одна отметка времени на всю страницу заказов
+            parsed_at = datetime.now().isoformat()
             
-            for block in h2_elements:
-                try:
-                    # Проверяем лимит заказов
-                    if max_orders and len(orders) >= max_orders:
-                        break
-                    
-                    # Ищем ссылку в h2
-                    link = block.find('a')
-                    if not link:
-                        continue
-                    
-                    href = link.get('href', '')
-                    if not href or '/projects/' not in href or 'category' in href:
-                        continue  # Пропускаем ссылки на категории
-                    
-                    # Извлекаем данные заказа из индивидуальной страницы
-                    order = self._extract_order_from_individual_page(href)
-                    if order:
-                        orders.append(order)
-                        
-                except Exception as e:
-                    self.logger.debug(f"Ошибка обработки блока: {str(e)}")
-                    continue
+            if self.fetch_details:
+                return await self._parse_detail_pages(session, root, parsed_at, max_orders)
             
-            return orders
+            return await asyncio.to_thread(self._parse_listing, root, parsed_at, max_orders)
             
         except Exception as e:
             self.logger.error(f"Ошибка загрузки страницы {page}: {str(e)}")
             return []
     
-    def _extract_order_from_individual_page(self, href: str) -> Dict:
-        """Извлечение данных заказа с индивидуальной страницы"""
-        try:
-            # Формируем полную ссылку
-            if href.startswith('/'):
-                full_url = f"{self.base_url}{href}"
-            else:
-                full_url = href
+    async def _read_listing(self, response: aiohttp.ClientResponse, max_orders: int = None) -> bytes:
+        """
+        Чтение страницы списка частями с ранней остановкой
+        
+        Как только в буфере начинается карточка номер max_orders + 1, первые max_orders
+        карточек уже загружены целиком и остаток страницы можно не читать.
+        Если разметка карточек не распознана, страница читается полностью.
+        """
+        if not max_orders:
+            return await response.read()
+        
+        body = bytearray()
+        cards = 0
+        scan_from = 0  # Начала карточек до этой позиции уже посчитаны
+        async for chunk in response.content.iter_chunked(LISTING_CHUNK_SIZE):
+            body += chunk
             
-            # ID заказа из URL
-            order_id_match = re.search(r'/projects/(\d+)/', href)
-            if not order_id_match:
-                # Используем хэш от URL как ID
-                order_id = f"fl_{abs(hash(href)) % 1000000}"
-            else:
-                order_id = f"fl_{order_id_match.group(1)}"
+            # Ищем только в новых байтах (плюс перекрытие), а не во всём буфере заново
+            for match in _CARD_START_RE.finditer(body, scan_from):
+                cards += 1
+                scan_from = match.end()
+            if cards > max_orders:
+                break
+            scan_from = max(scan_from, len(body) - _CARD_START_OVERLAP)
+        
+        return bytes(body)
+    
+    def _parse_listing(self, root: lxml_html.HtmlElement, parsed_at: str, max_orders: int = None) -> List[Dict]:
+        """Извлечение заказов из карточек на странице списка (без дополнительных запросов)"""
+        orders = []
+        
+        cards = _XP_CARDS(root)
+        if not cards:
+            # Разметка карточек не распознана - берём хотя бы заголовки и ссылки
+            cards = _XP_PROJECT_HEADINGS(root)
+        
+        for card in cards:
+            # Проверяем лимит заказов
+            if max_orders and len(orders) >= max_orders:
+                break
             
-            # Загружаем индивидуальную страницу заказа
-            response = self.session.get(full_url, timeout=10)
-            response.raise_for_status()
+            try:
+                order = self._parse_listing_card(card, parsed_at)
+                if order:
+                    orders.append(order)
+            except Exception as e:
+                self.logger.debug(f"Ошибка обработки карточки: {str(e)}")
+                continue
+        
+        return orders
+    
+    def _parse_listing_card(self, card, parsed_at: str) -> Optional[Dict]:
+        """Парсинг карточки заказа со страницы списка"""
+        link = _first(_XP_CARD_LINK, card)
+        if link is None:
+            return None
+        
+        href = link.get('href', '')
+        title = self._clean_text(link.text_content())
+        if not href or not title:
+            return None
+        
+        def card_text(xpath: XPath, default: str) -> str:
+            element = _first(xpath, card)
+            text = self._clean_text(element.text_content()) if element is not None else ""
+            return text or default
+        
+        return {
+            'id': self._order_id(href),
+            'title': title,
+            'url': self._full_url(href),
+            'source': 'FL.ru',
+            'price': card_text(_XP_CARD_PRICE, "По договорённости"),
+            'category': 'Программирование',
+            'author': card_text(_XP_CARD_USER, "Не указан"),
+            'published': card_text(_XP_CARD_TIME, "Недавно"),
+            'description': card_text(_XP_CARD_TEXT, title),
+            'parsed_at': parsed_at
+        }
+    
+    async def _parse_detail_pages(self, session: aiohttp.ClientSession, root: lxml_html.HtmlElement,
+                                  parsed_at: str, max_orders: int = None) -> List[Dict]:
+        """Загрузка и парсинг индивидуальных страниц заказов со страницы списка"""
+        # Собираем ссылки на заказы одним XPath запросом (ссылки на категории отсекаются сразу)
+        hrefs = _XP_PROJECT_HREFS(root)
+        if max_orders:
+            hrefs = hrefs[:max_orders]
+        
+        # Загружаем индивидуальные страницы заказов параллельно
+        sem = asyncio.Semaphore(DETAIL_CONCURRENCY)
+        pages_html = await asyncio.gather(
+            *[self._afetch(session, self._full_url(href), sem, DETAIL_MAX_BYTES) for href in hrefs],
+            return_exceptions=True
+        )
+        
+        loaded = []
+        for href, detail_page in zip(hrefs, pages_html):
+            if isinstance(detail_page, Exception):
+                self.logger.debug(f"Ошибка загрузки индивидуальной страницы {href}: {str(detail_page)}")
+                continue
+            loaded.append((href, *detail_page))
+        
+        # Извлекаем данные заказов из индивидуальных страниц в потоках (вне цикла событий)
+        orders = await asyncio.gather(*(
+            asyncio.to_thread(self._extract_order_from_individual_page, href, detail_html, parsed_at, encoding)
+            for href, detail_html, encoding in loaded
+        ))
+        
+        return [order for order in orders if order]
+    
+    def _order_id(self, href: str) -> str:
+        """ID заказа из URL"""
+        order_id_match = _PROJECT_ID_RE.search(href)
+        if not order_id_match:
+            # Используем хэш от URL как ID (стабильный между перезапусками, в отличие от hash())
+            return f"fl_{hashlib.blake2b(href.encode('utf-8'), digest_size=8).hexdigest()}"
+        return f"fl_{order_id_match.group(1)}"
+    
+    def _full_url(self, href: str) -> str:
+        """Формирование полной ссылки на заказ"""
+        if href.startswith('/'):
+            return f"{self.base_url}{href}"
+        return href
+    
+    def _extract_order_from_individual_page(self, href: str, html: bytes, parsed_at: str,
+                                            encoding: str = None) -> Optional[Dict]:
+        """Извлечение данных заказа с индивидуальной страницы"""
+        try:
+            full_url = self._full_url(href)
+            order_id = self._order_id(href)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            root = _parse_html(html, encoding)
+            if root is None:
+                return None
             
             # Извлекаем данные с индивидуальной страницы
-            order_data = self._parse_individual_page(soup, full_url, order_id)
+            order_data = self._parse_individual_page(root, full_url, order_id, parsed_at)
             
             return order_data
             
         except Exception as e:
-            self.logger.debug(f"Ошибка загрузки индивидуальной страницы {href}: {str(e)}")
+            self.logger.debug(f"Ошибка разбора индивидуальной страницы {href}: {str(e)}")
             return None
     
-    def _parse_individual_page(self, soup: BeautifulSoup, url: str, order_id: str) -> Dict:
+    def _parse_individual_page(self, root: lxml_html.HtmlElement, url: str, order_id: str, parsed_at: str) -> Dict:
         """Парсинг данных с индивидуальной страницы заказа"""
         try:
             # 1. Заголовок - ищем h1 или заголовок в title
             title = "Заказ без названия"
             
             # Сначала ищем h1
-            h1_element = soup.find('h1')
-            if h1_element:
-                title = self._clean_text(h1_element.get_text())
+            h1_element = _first(_XP_H1, root)
+            if h1_element is not None:
+                title = self._clean_text(h1_element.text_content())
             
             # Если h1 не найден, ищем в title страницы
             if not title or title == "Заказ без названия":
-                title_element = soup.find('title')
-                if title_element:
-                    title_text = title_element.get_text()
+                title_element = _first(_XP_TITLE, root)
+                if title_element is not None:
+                    title_text = title_element.text_content()
                     # Убираем "FL.ru" и другие лишние части
                     title = title_text.split(' | ')[0].split(' - ')[0].strip()
                     title = self._clean_text(title)
             
-            # 2. Бюджет - ищем по ключевым словам
-            price = "По договорённости"
-            page_text = soup.get_text()
-            
-            budget_patterns = [
-                r'Бюджет:\s*([^\n\r]+)',
-                r'бюджет:\s*([^\n\r]+)',
-                r'по договор[её]нности',
-                r'(\d+[\s\d,]*)\s*руб',
-                r'(\d+[\s\d,]*)\s*рублей'
-            ]
-            
-            for pattern in budget_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    if 'договор' in pattern:
-                        price = "По договорённости"
-                    else:
-                        price = match.group(1).strip()
-                    break
-            
-            # 3. Описание заказа - берём заголовок как описание или ищем большой блок текста
-            description = title
+            # 2. Бюджет, автор и дата публикации - один проход по тексту блока заказа
+            # (меню, сайдбар и футер страницы в поиск не попадают)
+            content_node = next(
+                (node for node in (_first(xpath, root) for xpath in _XP_CONTENT) if node is not None),
+                root
+            )
+            # Текстовые узлы разделяем переносом строки, чтобы соседние узлы не склеивались,
+            # а шаблоны вида "Бюджет: ..." захватывали только свою строку
+            page_text = '\n'.join(filter(None, map(str.strip, _XP_TEXT_NODES(content_node))))
+            price, author, published = self._scan_page_fields(page_text)
             
-            # Ищем div с текстом, который может быть описанием
-            desc_candidates = soup.find_all(['div', 'p'], string=lambda text: text and len(text.strip()) > 30)
-            for candidate in desc_candidates:
-                text = candidate.get_text().strip()
-                if len(text) > 50 and text != title:
-                    # Проверяем что это не футер или системный текст
-                    if not any(word in text.lower() for word in ['сведения об ооо', 'fl.ru', 'copyright', '©']):
-                        description = text[:300]
-                        break
-            
-            # 4. Автор - ищем информацию о заказчике
-            author = "Не указан"
-            
-            # Ищем заказчика
-            customer_patterns = [
-                r'Заказчик\s*([^\n\r]+)',
-                r'заказчик\s*([^\n\r]+)',
-                r'Автор:\s*([^\n\r]+)',
-                r'автор:\s*([^\n\r]+)'
-            ]
-            
-            for pattern in customer_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    author = match.group(1).strip()[:50]
-                    break
-            
-            # 5. Дата публикации - ищем по ключевым словам
-            published = "Недавно"
-            
-            date_patterns = [
-                r'Опубликован:\s*([^\n\r]+)',
-                r'опубликован:\s*([^\n\r]+)',
-                r'Размещен:\s*([^\n\r]+)',
-                r'размещен:\s*([^\n\r]+)',
-                r'(\d{1,2}[./]\d{1,2}[./]\d{4})',
-                r'(\d+)\s*минут[уы]?\s*назад',
-                r'(\d+)\s*час[ова]?\s*назад',
-                r'(\d+)\s*дн[яей]+\s*назад'
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    published = match.group(1).strip() if 'опубликован' in pattern.lower() else match.group(0)
-                    break
+            # 3. Описание заказа - берём заголовок как описание или первый большой блок текста
+            # (обход дерева останавливается на первом подходящем блоке)
+            description = next(self._iter_description_candidates(root, title), title)
             
             order = {
                 'id': order_id,
@@ -245,7 +440,7 @@ class FLParser:
                 'author': author,
                 'published': published,
                 'description': description,
-                'parsed_at': datetime.now().isoformat()
+                'parsed_at': parsed_at
             }
             
             return order
@@ -254,13 +449,68 @@ class FLParser:
             self.logger.debug(f"Ошибка парсинга индивидуальной страницы: {str(e)}")
             return None
     
+    def _iter_description_candidates(self, root: lxml_html.HtmlElement, title: str) -> Iterator[str]:
+        """Генератор текстов div/p, которые могут быть описанием заказа (в порядке документа)"""
+        for node in root.iter('div', 'p'):
+            string = _single_string(node)
+            if not string:
+                continue
+            
+            text = string.strip()
+            if len(text) > 50 and text != title:
+                # Проверяем что это не футер или системный текст
+                if not _FOOTER_RE.search(text):
+                    yield text[:300]
+    
+    def _scan_page_fields(self, page_text: str) -> Tuple[str, str, str]:
+        """
+        Поиск бюджета, заказчика и даты публикации за один проход по тексту
+        
+        Для каждого поля берётся первое совпадение в тексте страницы.
+        
+        Returns:
+            Кортеж (цена, автор, дата публикации)
+        """
+        price = author = published = None
+        filled = 0  # Битовая маска найденных полей: цена | автор | дата
+        
+        for match in _FIELDS_RE.finditer(page_text):
+            kind = match.lastgroup
+            
+            if kind in ('budget', 'negotiable', 'budget_rub'):
+                if filled & _PRICE_FOUND:
+                    continue
+                if kind == 'budget':
+                    price = match.group('budget_value').strip()
+                elif kind == 'budget_rub':
+                    price = match.group('rub_value').strip()
+                else:
+                    price = "По договорённости"
+                filled |= _PRICE_FOUND
+            elif kind == 'customer':
+                if filled & _AUTHOR_FOUND:
+                    continue
+                author = match.group('customer_value').strip()[:50]
+                filled |= _AUTHOR_FOUND
+            else:
+                if filled & _PUBLISHED_FOUND:
+                    continue
+                published = match.group('pub_value').strip() if kind == 'pub' else match.group(0)
+                filled |= _PUBLISHED_FOUND
+            
+            # Все три поля найдены - остаток текста не сканируем
+            if filled == _ALL_FOUND:
+                break
+        
+        return price or "По договорённости", author or "Не указан", published or "Недавно"
+    
     def _clean_text(self, text: str) -> str:
         """Очистка текста от лишних символов"""
         if not text:
             return ""
         
         # Убираем лишние пробелы и переносы строк
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WS_RE.sub(' ', text).strip()
         
         # Убираем специальные символы
         text = text.replace('\n', ' ').replace('\t', ' ')
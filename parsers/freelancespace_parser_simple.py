@@ -1,10 +1,18 @@
-import requests
-import json
+import asyncio
+from contextlib import asynccontextmanager
+import hashlib
+import aiohttp
+from lxml import html as lxml_html
+from lxml.etree import XPath, XMLSyntaxError
+import queue
+import re
 import time
-from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 
+from .sent_orders import SentOrdersCache
+from .timeparse import time_to_minutes
+
 # Импортируем настройки производительности
 try:
     from performance_config import get_performance_settings
@@ -18,25 +26,160 @@ except ImportError:
         'description': 'Быстрый режим по умолчанию'
     }
 
+# Список валидных категорий FreelanceSpace.ru
+VALID_CATEGORIES = frozenset({
+    'Разработка', 'Дизайн', 'Копирайтинг', 'SEO продвижение',
+    'Маркетинг', 'Другое', 'Администрирование', 'DevOps',
+    'AI - искусственный интеллект', 'Программирование',
+    'Аудио/виде/фото', 'Реклама и маркетинг', 'Копирайтинг и тексты'
+})
+
+# Категории, которые ищутся в тексте блока, если строка категории не найдена (в порядке приоритета)
+FALLBACK_CATEGORIES = (
+    'Разработка', 'Дизайн', 'AI - искусственный интеллект', 'SEO продвижение', 'Программирование'
+)
+
+# Метка источника в поле 'source' заказов (так же площадка называется в уведомлениях и статистике)
+SOURCE = 'FreelanceSpace.ru'
+
+# Максимум одновременных запросов страниц FreelanceSpace.ru
+PAGE_CONCURRENCY = 8
+
+# Повтор запроса страницы при перегрузке сервера (задержка растёт вдвое с каждой попыткой)
+PAGE_RETRIES = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Размер куска тела ответа, передаваемого потоковому HTML парсеру
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _class_xpath(*names: str) -> str:
+    """
+    XPath условие "у элемента есть хотя бы один из классов"
+    (та же семантика, что у class_=[...] в BeautifulSoup)
+    """
+    return ' or '.join(
+        f'contains(concat(" ", normalize-space(@class), " "), " {name} ")' for name in names
+    )
+
+def _all_classes_xpath(*names: str) -> str:
+    """XPath условие "у элемента есть все перечисленные классы" (как составной CSS селектор)"""
+    return ' and '.join(f'({_class_xpath(name)})' for name in names)
+
+# Предкомпилированные XPath выражения: обход дерева выполняется в libxml2, а не в Python
+
+# Блоки заказов одним запросом: ближайший div с рамкой вокруг ссылки на заказ
+# или кнопки "Откликнуться" (объединение XPath само убирает повторы)
+_XP_ORDER_BLOCKS = XPath(
+    '//a[contains(@href, "order?id=")]/ancestor::div[contains(@class, "border") and contains(@class, "rounded")][1]'
+    ' | //*[text()[contains(., "Откликнуться")]]/ancestor-or-self::div[contains(@class, "border")][1]'
+)
+
+# Эвристический поиск блоков заказов (если разметка изменилась)
+_XP_ACTION_TEXT_PARENTS = XPath('//*[text()[contains(., "Откликнуться")]]')
+_XP_BLOCK_CANDIDATES = (
+    XPath(f'//div[{_all_classes_xpath("border", "border-gray-300")}]'),  # Основной селектор блоков
+    XPath('//div[contains(@class, "border")]'),   # Любые блоки с border
+    XPath('//div[contains(@class, "shadow")]'),   # Блоки с тенью
+    XPath('//div[contains(@class, "rounded")]'),  # Округлённые блоки
+)
+_XP_ORDER_LINKS = XPath('//a[contains(@href, "order?id=")]')
+_XP_ORDER_LINK_HREFS = XPath(
+    './/a[contains(@href, "order") or contains(@href, "task") or contains(@href, "project")]'
+)
+
+# Поля заказа внутри блока
+_XP_TITLE_LINK = XPath(
+    f'descendant::h2[{_all_classes_xpath("text-xl", "font-semibold", "text-gray-800", "mb-2")}][1]/descendant::a[1]'
+)
+# Имя автора в верхней части блока: сначала видимый на desktop span (hidden sm:inline), затем font-semibold
+_AUTHOR_CONTAINER = f'descendant::div[{_class_xpath("flex", "items-start", "md:items-center", "gap-4")}][1]'
+_XP_DESKTOP_AUTHOR_SPANS = XPath(
+    f'{_AUTHOR_CONTAINER}//span[{_class_xpath("hidden")}][{_class_xpath("sm:inline")}]'
+)
+_XP_AUTHOR_SPANS = XPath(f'{_AUTHOR_CONTAINER}//span[{_class_xpath("font-semibold")}]')
+_XP_PRICE = XPath(
+    f'descendant::div[{_class_xpath("mt-2", "md:mt-0", "md:text-right")}][1]'
+    f'/descendant::p[{_class_xpath("font-semibold", "text-lg", "text-gray-800")}][1]'
+)
+# Строка под заголовком с категорией, просмотрами и временем публикации
+_STATS_ROW = (
+    f'descendant::div[{_class_xpath("flex", "items-center", "text-sm", "text-gray-500")}]'
+    f'[{_class_xpath("gap-4")}][{_class_xpath("mb-4")}]'
+)
+_XP_CATEGORY_CANDIDATES = XPath(f'{_STATS_ROW}/descendant::p[1]')  # Первый p строки - категория
+_XP_DESCRIPTION = XPath(
+    f'descendant::p[{_all_classes_xpath("text-sm", "text-gray-700", "mb-4", "break-words")}][1]'
+)
+
+# Признаки блока заказа: кнопка действия и детали заказа (цена, время или слова-индикаторы)
+_ACTION_RE = re.compile(r'Откликнуться|Подать заявку|Отправить предложение')
+_ORDER_DETAILS_RE = re.compile(
+    r'₽|руб|По договоренности|от |до '                               # Цена
+    r'|назад|час|день|минут|сегодня|вчера'                           # Время
+    r'|категори|заказ|проект|задач|работ|услуг'                      # Индикаторы заказа
+    r'|исполнител|заказчик|автор|опубликован|создан'
+)
+
+def _contains_any(*words: str, node: str = '.') -> str:
+    """XPath условие: текст узла содержит хотя бы одно из слов"""
+    return ' or '.join(f'contains({node}, "{word}")' for word in words)
+
+# Время публикации (способы поиска по убыванию надёжности, $title - заголовок заказа)
+_TIME_WORDS = ('назад', 'час', 'день', 'дня', 'дней', 'минут')
+_ICON = _class_xpath('material-symbols-outlined')
+_STATUS_TIME = 'substring-after(., "был(а)")'
+_XP_PUBLISHED = (
+    # Иконка schedule в строке статистики, время - следующий за ней p
+    XPath(
+        f'normalize-space(({_STATS_ROW}//span[{_ICON}][normalize-space() = "schedule"]'
+        f'/following-sibling::p[1][{_contains_any(*_TIME_WORDS)}])[1])'
+    ),
+    # Любой короткий p с временными словами, не похожий на цену, категорию или заголовок
+    XPath(
+        f'normalize-space((descendant::p[{_contains_any(*_TIME_WORDS, "секунд")}]'
+        f'[string-length(normalize-space()) < 50]'
+        f'[not({_contains_any("₽", "руб", "категори", "просмотр", "коммент")} or contains(., $title))])[1])'
+    ),
+    # p с временными словами рядом с любой иконкой schedule
+    XPath(
+        f'normalize-space((descendant::span[{_ICON}][contains(., "schedule")]'
+        f'/../descendant::p[{_contains_any(*_TIME_WORDS)}])[1])'
+    ),
+    # Статус автора "был(а) 2 часа назад"
+    XPath(
+        f'normalize-space(substring-after((descendant::span[{_class_xpath("text-gray-500")}]'
+        f'[{_contains_any("час", "день", "недавно", node=_STATUS_TIME)}])[1], "был(а)"))'
+    ),
+)
+
+def _node_text(element) -> str:
+    """Текст элемента без пробелов по краям"""
+    return element.text_content().strip()
+
 class FreelanceSpaceParserSimple:
-    def __init__(self, user_agent: str, cookies: dict = None):
+    def __init__(self, user_agent: str, cookies: dict = None, session: aiohttp.ClientSession = None,
+                 sent_orders_limit: int = 10_000):
         """
         Упрощённый парсер FreelanceSpace.ru без базы данных
         
         Args:
             user_agent: User-Agent для запросов
             cookies: Куки для авторизации
+            session: Общая aiohttp сессия приложения (без неё сессия создаётся на каждый парсинг)
+            sent_orders_limit: Сколько ID отправленных заказов помнить (память не растёт сверх лимита)
         """
         self.base_url = "https://freelancespace.ru"
         self.api_url = "https://freelancespace.ru/ajax/filter_orders.php"
-        self.session = requests.Session()
+        self.cookies = cookies or {}
+        self.session = session
         
-        # Настройка заголовков
-        self.session.headers.update({
+        # Заголовки для aiohttp сессии (Accept-Encoding aiohttp выставляет сам по доступным декодерам)
+        self.headers = {
             'User-Agent': user_agent,
             'Accept': '*/*',
             'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br, zstd',
+            'Connection': 'keep-alive',
             'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
             'Origin': 'https://freelancespace.ru',
             'Referer': 'https://freelancespace.ru/dashboard',
@@ -47,19 +190,24 @@ class FreelanceSpaceParserSimple:
             'Sec-Fetch-Mode': 'cors',
             'Sec-Fetch-Site': 'same-origin',
             'X-Requested-With': 'XMLHttpRequest'
-        })
+        }
         
-        if cookies:
-            self.session.cookies.update(cookies)
-            
-        # Настройка логирования
-        logging.basicConfig(level=logging.INFO)
+        # Логгер модуля (обработчики настраиваются один раз в точке входа приложения)
         self.logger = logging.getLogger(__name__)
         
-        # Список уже отправленных заказов (в памяти)
-        self.sent_orders = set()
+        # Уже отправленные заказы (в памяти, ограниченного размера)
+        self.sent_orders = SentOrdersCache(maxlen=sent_orders_limit)
+        
+        # Последний сработавший XPath для полей с несколькими способами поиска (поле -> XPath)
+        self._xpath_cache = {}
     
     def parse_orders(self, max_pages: int = 5, search: str = "") -> List[Dict]:
+        """
+        Парсинг заказов с FreelanceSpace.ru (синхронная обёртка над aparse_orders)
+        """
+        return asyncio.run(self.aparse_orders(max_pages, search))
+    
+    async def aparse_orders(self, max_pages: int = 5, search: str = "") -> List[Dict]:
         """
         Парсинг заказов с FreelanceSpace.ru с нескольких страниц
         
@@ -73,128 +221,213 @@ class FreelanceSpaceParserSimple:
         all_orders = []
         start_time = time.time()
         
-        self.logger.info(f"🚀 БЫСТРЫЙ парсинг {max_pages} страниц (без задержек)...")
+        page_delay = PERFORMANCE_MODE.get('page_delay', 0.0)
+        self.logger.info(f"🚀 БЫСТРЫЙ парсинг {max_pages} страниц ({'с задержкой' if page_delay > 0 else 'параллельно'})...")
         
-        for page in range(1, max_pages + 1):
-            try:
-                page_start = time.time()
+        pages = await self._afetch_all(max_pages, search, page_delay)
+        
+        # Страницы после первой неудачной не нужны
+        roots = []
+        for root in pages:
+            if root is None:
+                break
+            roots.append(root)
+        
+        # Извлечение заказов - CPU работа в libxml2, которая отпускает GIL: страницы разбираются
+        # параллельно в пуле потоков, и event loop бота на это время не блокируется
+        parse_start = time.time()
+        pages_orders = await asyncio.gather(
+            *(self._aparse_document(root, page) for page, root in enumerate(roots, 1)),
+            return_exceptions=True
+        )
+        parse_time = time.time() - parse_start
+        
+        # Собираем заказы по порядку: первая страница без заказов завершает парсинг
+        for page, orders in enumerate(pages_orders, 1):
+            if isinstance(orders, Exception):
+                self.logger.error(f"❌ Страница {page}: неожиданная ошибка: {str(orders)}")
+                continue
+            
+            if not orders:
+                self.logger.info(f"🚫 Страница {page}: заказы не найдены, прекращаем парсинг")
+                break
+            
+            all_orders.extend(orders)
+            self.logger.info(f"⚡ Страница {page}: добавлено {len(orders)} заказов")
+        
+        self.logger.info(f"🧩 Разбор {len(roots)} страниц: {parse_time:.2f}с")
+        
+        # СОРТИРУЕМ ПО ВРЕМЕНИ ПУБЛИКАЦИИ (самые свежие в конце)
+        all_orders_sorted = self._sort_orders_by_time(all_orders)
+        
+        total_time = time.time() - start_time
+        self.logger.info(f"🏁 ИТОГО: {len(all_orders_sorted)} заказов за {total_time:.2f} секунд (скорость: {len(all_orders_sorted)/total_time:.1f} заказов/сек)")
+        return all_orders_sorted
+    
+    async def _aparse_document(self, root, page: int) -> List[Dict]:
+        """Извлечение заказов из страницы в пуле потоков (root может быть ошибкой загрузки)"""
+        if isinstance(root, Exception):
+            raise root
+        return await asyncio.to_thread(self._parse_document, root, page)
+    
+    @asynccontextmanager
+    async def _session_scope(self):
+        """Общая сессия, если она передана, иначе временная сессия на один парсинг"""
+        if self.session is not None:
+            yield self.session
+            return
+        
+        connector = aiohttp.TCPConnector(limit=PAGE_CONCURRENCY, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(headers=self.headers, cookies=self.cookies, connector=connector) as session:
+            yield session
+    
+    async def _afetch_all(self, max_pages: int, search: str = "", page_delay: float = 0.0) -> List:
+        """
+        Загрузка страниц заказов через одну aiohttp сессию (keep-alive соединения)
+        
+        Без задержки все страницы запрашиваются одновременно, с задержкой (безопасный режим) -
+        по одной до первой неудачной.
+        
+        Returns:
+            Корни разобранных страниц по порядку (None - неудачная или пустая страница,
+            Exception - неожиданная ошибка)
+        """
+        async with self._session_scope() as session:
+            if page_delay <= 0:
+                return await asyncio.gather(
+                    *(self._afetch_page(session, page, max_pages, search) for page in range(1, max_pages + 1)),
+                    return_exceptions=True
+                )
+            
+            pages = []
+            for page in range(1, max_pages + 1):
+                # НАСТРАИВАЕМАЯ ЗАДЕРЖКА: берём из настроек производительности
+                if page > 1:
+                    await asyncio.sleep(page_delay)
                 
-                # Данные для POST запроса
-                data = {
-                    'search': search,
-                    'page': page
-                }
+                try:
+                    root = await self._afetch_page(session, page, max_pages, search)
+                except Exception as e:
+                    root = e
                 
+                pages.append(root)
+                if root is None:
+                    break
+            
+            return pages
+    
+    async def _afetch_page(self, session: aiohttp.ClientSession, page: int, max_pages: int,
+                           search: str = "") -> Optional[lxml_html.HtmlElement]:
+        """
+        Загрузка и потоковый разбор одной страницы заказов (с повтором при 429/5xx)
+        
+        Returns:
+            Корень HTML дерева или None, если парсинг нужно прекратить
+        """
+        # Данные для POST запроса
+        data = {
+            'search': search,
+            'page': page
+        }
+        
+        for attempt in range(PAGE_RETRIES + 1):
+            try:
+                page_start = time.time()
                 self.logger.info(f"📤 Страница {page}/{max_pages}: POST запрос на {self.api_url}")
                 
-                response = self.session.post(self.api_url, data=data, timeout=30)
+                async with session.post(self.api_url, data=data, headers=self.headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    status = response.status
+                    root, size = await self._aread_document(response) if status == 200 else (None, 0)
                 
                 request_time = time.time() - page_start
+                self.logger.info(f"📥 Страница {page}: статус {status}, размер {size} байт (запрос {request_time:.2f}с)")
                 
-                parse_start = time.time()
-                self.logger.info(f"📥 Страница {page}: статус {response.status_code}, размер {len(response.text)} символов (запрос {request_time:.2f}с)")
+                if status == 200:
+                    return root
                 
-                if response.status_code == 200:
-                    orders = self._parse_html_response(response.text, page)
-                    parse_time = time.time() - parse_start
-                    
-                    if not orders:
-                        self.logger.info(f"🚫 Страница {page}: заказы не найдены, прекращаем парсинг")
-                        break
-                        
-                    all_orders.extend(orders)
-                    page_total = time.time() - page_start
-                    self.logger.info(f"⚡ Страница {page}: добавлено {len(orders)} заказов за {page_total:.2f}с (запрос: {request_time:.2f}с, парсинг: {parse_time:.2f}с)")
-                    
-                    # НАСТРАИВАЕМАЯ ЗАДЕРЖКА: берём из настроек производительности
-                    page_delay = PERFORMANCE_MODE.get('page_delay', 0.0)
-                    if page_delay > 0 and page < max_pages:
-                        time.sleep(page_delay)
-                else:
-                    self.logger.error(f"❌ Страница {page}: HTTP ошибка {response.status_code}")
-                    break
-                    
-            except requests.exceptions.Timeout:
+                if status in RETRY_STATUSES and attempt < PAGE_RETRIES:
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+                    continue
+                
+                self.logger.error(f"❌ Страница {page}: HTTP ошибка {status}")
+                return None
+                
+            except asyncio.TimeoutError:
                 self.logger.error(f"⏰ Страница {page}: таймаут запроса")
-                break
-            except requests.exceptions.ConnectionError as e:
+                return None
+            except aiohttp.ClientError as e:
                 self.logger.error(f"🌐 Страница {page}: ошибка соединения: {str(e)}")
-                break
-            except Exception as e:
-                self.logger.error(f"❌ Страница {page}: неожиданная ошибка: {str(e)}")
-                continue
+                return None
+    
+    async def _aread_document(self, response: aiohttp.ClientResponse) -> Tuple[Optional[lxml_html.HtmlElement], int]:
+        """
+        Потоковый разбор тела ответа в пуле потоков
         
-        # СОРТИРУЕМ ПО ВРЕМЕНИ ПУБЛИКАЦИИ (самые свежие в конце)
-        all_orders_sorted = self._sort_orders_by_time(all_orders)
+        Цикл событий только читает куски и передаёт их через очередь потоку, который
+        сразу скармливает их парсеру lxml: страница не собирается целиком ни в байтах,
+        ни в строке, а разбор не занимает цикл событий.
         
-        total_time = time.time() - start_time
-        self.logger.info(f"🏁 ИТОГО: {len(all_orders_sorted)} заказов за {total_time:.2f} секунд (скорость: {len(all_orders_sorted)/total_time:.1f} заказов/сек)")
-        return all_orders_sorted
+        Returns:
+            Корень HTML дерева (None для пустого ответа) и размер тела в байтах
+        """
+        chunks = queue.SimpleQueue()
+        build = asyncio.ensure_future(
+            asyncio.to_thread(self._build_document, chunks, response.charset or 'utf-8')
+        )
+        size = 0
+        
+        try:
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                chunks.put(chunk)
+                size += len(chunk)
+        finally:
+            chunks.put(None)  # Конец тела (и при ошибке чтения - поток не останется ждать)
+        
+        return await build, size
     
-    def _parse_html_response(self, html: str, page_num: int = 1) -> List[Dict]:
+    @staticmethod
+    def _build_document(chunks: queue.SimpleQueue, encoding: str) -> Optional[lxml_html.HtmlElement]:
+        """Сборка HTML дерева из кусков ответа по мере их поступления (None - конец тела)"""
+        parser = lxml_html.HTMLParser(encoding=encoding)
+        for chunk in iter(chunks.get, None):
+            parser.feed(chunk)
+        
+        try:
+            return parser.close()
+        except XMLSyntaxError:
+            # Пустой ответ
+            return None
+    
+    def _parse_document(self, root: lxml_html.HtmlElement, page_num: int = 1) -> List[Dict]:
         """
-        Парсинг HTML ответа для извлечения информации о заказах
+        Извлечение заказов из разобранной HTML страницы
         
         Args:
-            html: HTML код ответа
+            root: Корень HTML дерева страницы
             
         Returns:
             Список заказов
         """
-        from bs4 import BeautifulSoup
-        
         orders = []
-        soup = BeautifulSoup(html, 'html.parser')
         
-        self.logger.info(f"🔍 Страница {page_num}: начинаем парсинг HTML (размер: {len(html)} символов)")
+        self.logger.info(f"🔍 Страница {page_num}: поиск блоков заказов")
         
-        # Метод 1: Ищем заказы по кнопке "Откликнуться"
-        buttons = soup.find_all(text=lambda text: text and 'Откликнуться' in text)
-        self.logger.info(f"🔍 Страница {page_num}: найдено {len(buttons)} элементов с текстом 'Откликнуться'")
+        order_blocks = _XP_ORDER_BLOCKS(root)
         
-        order_blocks = []
-        for button in buttons:
-            parent = button.find_parent()
-            depth = 0
-            while parent and depth < 15:  # Увеличиваем глубину поиска
-                if self._is_order_block(parent):
-                    order_blocks.append(parent)
-                    break
-                parent = parent.find_parent()
-                depth += 1
-        
-        # Метод 2: Ищем по CSS селекторам (структура блоков)
-        css_selectors = [
-            'div.border.border-gray-300',  # Основной селектор блоков
-            'div[class*="border"]',        # Любые блоки с border
-            'div[class*="shadow"]',        # Блоки с тенью
-            'div[class*="rounded"]',       # Округлённые блоки
-        ]
+        # Тексты блоков, уже собранные при поиске (чтобы не обходить поддерево блока повторно)
+        block_texts = {}
         
-        for selector in css_selectors:
-            blocks = soup.select(selector)
-            for block in blocks:
-                if self._is_order_block(block) and block not in order_blocks:
-                    order_blocks.append(block)
-        
-        # Метод 3: Поиск по ссылкам на заказы
-        order_links = soup.find_all('a', href=lambda x: x and 'order?id=' in x)
-        for link in order_links:
-            parent = link.find_parent()
-            depth = 0
-            while parent and depth < 10:
-                if self._is_order_block(parent) and parent not in order_blocks:
-                    order_blocks.append(parent)
-                    break
-                parent = parent.find_parent()
-                depth += 1
+        if not order_blocks:
+            # Разметка изменилась - ищем блоки эвристиками по всей странице
+            self.logger.info(f"🔎 Страница {page_num}: блоки по разметке не найдены, эвристический поиск")
+            order_blocks = self._find_order_blocks_fallback(root, page_num, block_texts)
         
         self.logger.info(f"📊 Страница {page_num}: всего найдено {len(order_blocks)} блоков для анализа")
         
         # Анализируем найденные блоки
         for i, block in enumerate(order_blocks):
             try:
-                order = self._extract_order_data(block)
+                order = self._extract_order_data(block, block_texts.get(block))
                 if order:
                     orders.append(order)
                     self.logger.info(f"✅ Страница {page_num}, блок {i+1}: {order.get('title', 'Без названия')}")
@@ -205,73 +438,121 @@ class FreelanceSpaceParserSimple:
         self.logger.info(f"🎉 Страница {page_num}: извлечено {len(orders)} заказов")
         return orders
     
-    def _is_order_block(self, element) -> bool:
-        """Проверка, является ли элемент блоком заказа"""
-        if not element or not hasattr(element, 'get_text'):
-            return False
+    def _find_order_blocks_fallback(self, root, page_num: int = 1, block_texts: Dict = None) -> List:
+        """
+        Эвристический поиск блоков заказов (кнопка "Откликнуться", классы блоков, ссылки на заказы)
+        
+        Используется, только если основной XPath не нашёл ни одного блока
         
-        text = element.get_text()
+        Args:
+            block_texts: Словарь, в который сохраняется текст каждого найденного блока
+        """
+        if block_texts is None:
+            block_texts = {}
+
+        # Метод 1: Ищем заказы по кнопке "Откликнуться"
+        buttons = _XP_ACTION_TEXT_PARENTS(root)
+        self.logger.info(f"🔍 Страница {page_num}: найдено {len(buttons)} элементов с текстом 'Откликнуться'")
         
-        # Обязательные элементы для заказа
-        has_action_button = any(word in text for word in ['Откликнуться', 'Подать заявку', 'Отправить предложение'])
+        # Повторы отсекаются по id() узла - без линейного поиска по списку
+        order_blocks = []
+        seen_ids = set()
         
-        # Ценовые индикаторы
-        has_price = any(word in text for word in ['₽', 'руб', 'По договоренности', 'от ', 'до ', 'руб.'])
+        # Методы поиска проверяют одни и те же узлы-предки: решение _is_order_block запоминается
+        # (ключ - сам узел, поэтому он не удаляется сборщиком мусора до конца разбора страницы)
+        is_order_cache = {}
         
-        # Временные индикаторы
-        has_time = any(word in text for word in ['назад', 'час', 'день', 'минут', 'сегодня', 'вчера'])
+        def is_order(node) -> bool:
+            result = is_order_cache.get(node)
+            if result is None:
+                text = node.text_content()
+                result = is_order_cache[node] = self._is_order_block(node, text)
+                if result:
+                    block_texts[node] = text
+            return result
         
-        # Дополнительные индикаторы заказа
-        has_order_indicators = any(word in text for word in [
-            'категори', 'заказ', 'проект', 'задач', 'работ', 'услуг',
-            'исполнител', 'заказчик', 'автор', 'опубликован', 'создан'
-        ])
+        for button in buttons:
+            parent = button
+            depth = 0
+            while parent is not None and depth < 15:  # Увеличиваем глубину поиска
+                if is_order(parent):
+                    if id(parent) not in seen_ids:
+                        seen_ids.add(id(parent))
+                        order_blocks.append(parent)
+                    break
+                parent = parent.getparent()
+                depth += 1
         
-        # Проверяем размер блока (заказы обычно содержательные)
-        is_substantial = len(text.strip()) > 50
+        # Метод 2: Ищем по классам блоков (структура блоков)
+        for xpath in _XP_BLOCK_CANDIDATES:
+            blocks = xpath(root)
+            for block in blocks:
+                if id(block) not in seen_ids and is_order(block):
+                    seen_ids.add(id(block))
+                    order_blocks.append(block)
         
-        # Ищем ссылки на заказы
-        has_order_link = False
-        if hasattr(element, 'find_all'):
-            links = element.find_all('a', href=True)
-            for link in links:
-                href = link.get('href', '')
-                if 'order' in href or 'task' in href or 'project' in href:
-                    has_order_link = True
+        # Метод 3: Поиск по ссылкам на заказы
+        order_links = _XP_ORDER_LINKS(root)
+        for link in order_links:
+            parent = link.getparent()
+            depth = 0
+            while parent is not None and depth < 10:
+                if id(parent) not in seen_ids and is_order(parent):
+                    seen_ids.add(id(parent))
+                    order_blocks.append(parent)
                     break
+                parent = parent.getparent()
+                depth += 1
+        
+        return order_blocks
+    
+    def _is_order_block(self, element, text: str = None) -> bool:
+        """
+        Проверка, является ли элемент блоком заказа
+        
+        Args:
+            text: Уже вычисленный текст элемента (если None - берётся из элемента)
+        """
+        if element is None or not hasattr(element, 'text_content'):
+            return False
+        
+        if text is None:
+            text = element.text_content()
         
         # Блок считается заказом если:
-        # 1. Есть кнопка действия ИЛИ ссылка на заказ
-        # 2. Есть ценовая информация ИЛИ временная ИЛИ индикаторы заказа  
-        # 3. Блок достаточно содержательный
+        # 1. Блок достаточно содержательный
+        # 2. Есть кнопка действия ИЛИ ссылка на заказ
+        # 3. Есть ценовая информация ИЛИ временная ИЛИ индикаторы заказа
+        # Каждая группа слов - одно регулярное выражение (один проход по тексту в C),
+        # проверки идут от дешёвых к дорогим и прерываются на первой неудаче
         
-        is_order = (has_action_button or has_order_link) and \
-                   (has_price or has_time or has_order_indicators) and \
-                   is_substantial
+        if len(text.strip()) <= 50:
+            return False
+        
+        if _ACTION_RE.search(text) is None and not _XP_ORDER_LINK_HREFS(element):
+            return False
         
-        return is_order
+        return _ORDER_DETAILS_RE.search(text) is not None
     
-    def _extract_order_data(self, block) -> Optional[Dict]:
+    def _extract_order_data(self, block, block_text: str = None) -> Optional[Dict]:
         """
         Извлечение данных заказа из HTML блока по точной структуре FreelanceSpace
         
         Args:
-            block: BeautifulSoup элемент с заказом
+            block: lxml элемент с заказом
+            block_text: Уже вычисленный текст блока (если None - берётся из блока при необходимости)
             
         Returns:
             Словарь с данными заказа или None
         """
         try:
             # 1. Извлекаем заголовок и URL из h2 > a
-            title_element = block.find('h2', class_=['text-xl', 'font-semibold', 'text-gray-800', 'mb-2'])
-            if not title_element:
-                return None
-            
-            title_link = title_element.find('a')
-            if not title_link:
+            title_links = _XP_TITLE_LINK(block)
+            if not title_links:
                 return None
             
-            title = title_link.get_text(strip=True)
+            title_link = title_links[0]
+            title = _node_text(title_link)
             url = title_link.get('href', '')
             
             if not title:
@@ -290,157 +571,66 @@ class FreelanceSpaceParserSimple:
                     pass
             
             if not order_id:
-                order_id = str(abs(hash(title + url)))
+                # Хэш от заголовка и URL (стабильный между перезапусками, в отличие от hash())
+                order_id = hashlib.blake2b(f"{title}|{url}".encode('utf-8'), digest_size=8).hexdigest()
             
             # 2. Извлекаем автора из span с классом font-semibold в верхней части
             author = "Не указан"
-            # Ищем в верхней части блока, где информация об авторе
-            author_container = block.find('div', class_=['flex', 'items-start', 'md:items-center', 'gap-4'])
-            if author_container:
-                # Ищем span с именем автора - берем только видимый текст для desktop версии
-                author_spans = author_container.find_all('span', class_='hidden')
-                for span in author_spans:
-                    if 'sm:inline' in span.get('class', []):
-                        author_text = span.get_text(strip=True)
-                        # Проверяем, что это имя, а не заголовок
-                        if len(author_text) < 50 and author_text != title and '...' not in author_text:
-                            author = author_text
-                            break
-                
-                # Если не нашли в hidden span, ищем в обычных
-                if author == "Не указан":
-                    author_spans = author_container.find_all('span', class_=['text-gray-800', 'font-semibold'])
-                    for span in author_spans:
-                        if 'font-semibold' in span.get('class', []):
-                            author_text = span.get_text(strip=True)
-                            # Проверяем, что это имя, а не заголовок, и удаляем дубли
-                            if (len(author_text) < 50 and author_text != title and 
-                                '...' not in author_text and not author_text.endswith(author_text[:len(author_text)//2])):
-                                # Проверяем на дублирование имени (АрсенийАрсений -> Арсений)
-                                if len(author_text) > 2:
-                                    half_len = len(author_text) // 2
-                                    if author_text[:half_len] == author_text[half_len:]:
-                                        author = author_text[:half_len]
-                                    else:
-                                        author = author_text
-                                break
+            # Ищем span с именем автора - берем только видимый текст для desktop версии
+            for span in _XP_DESKTOP_AUTHOR_SPANS(block):
+                author_text = _node_text(span)
+                # Проверяем, что это имя, а не заголовок
+                if len(author_text) < 50 and author_text != title and '...' not in author_text:
+                    author = author_text
+                    break
+            
+            # Если не нашли в hidden span, ищем в обычных
+            if author == "Не указан":
+                for span in _XP_AUTHOR_SPANS(block):
+                    author_text = _node_text(span)
+                    # Проверяем, что это имя, а не заголовок, и удаляем дубли
+                    if (len(author_text) < 50 and author_text != title and 
+                        '...' not in author_text and not author_text.endswith(author_text[:len(author_text)//2])):
+                        # Проверяем на дублирование имени (АрсенийАрсений -> Арсений)
+                        if len(author_text) > 2:
+                            half_len = len(author_text) // 2
+                            if author_text[:half_len] == author_text[half_len:]:
+                                author = author_text[:half_len]
+                            else:
+                                author = author_text
+                        break
             
             # 3. Извлекаем цену из правого верхнего блока
             price = "Не указана"
-            price_container = block.find('div', class_=['mt-2', 'md:mt-0', 'md:text-right'])
-            if price_container:
-                price_element = price_container.find('p', class_=['font-semibold', 'text-lg', 'text-gray-800'])
-                if price_element:
-                    price = price_element.get_text(strip=True)
+            price_elements = _XP_PRICE(block)
+            if price_elements:
+                price = _node_text(price_elements[0])
             
             # 4. Извлекаем категорию из блока под заголовком  
             category = "Не указана"
-            # Ищем все блоки с категориями
-            category_containers = block.find_all('div', class_=['flex', 'items-center', 'text-sm', 'text-gray-500'])
-            for container in category_containers:
-                if 'mb-4' in container.get('class', []) and 'gap-4' in container.get('class', []):
-                    # Ищем первый p элемент - это категория
-                    first_p = container.find('p')
-                    if first_p:
-                        cat_text = first_p.get_text(strip=True)
-                        # Список валидных категорий
-                        valid_categories = [
-                            'Разработка', 'Дизайн', 'Копирайтинг', 'SEO продвижение', 
-                            'Маркетинг', 'Другое', 'Администрирование', 'DevOps', 
-                            'AI - искусственный интеллект', 'Программирование',
-                            'Аудио/виде/фото', 'Реклама и маркетинг', 'Копирайтинг и тексты'
-                        ]
-                        # Проверяем, что это действительно категория
-                        if (cat_text in valid_categories and 
-                            '₽' not in cat_text and 'руб' not in cat_text and 'договор' not in cat_text.lower()):
-                            category = cat_text
-                            break
+            # Первые p элементы строк под заголовком - кандидаты в категорию
+            for first_p in _XP_CATEGORY_CANDIDATES(block):
+                cat_text = _node_text(first_p)
+                # Проверяем, что это действительно категория (цена или договорённость в список не входят)
+                if cat_text in VALID_CATEGORIES:
+                    category = cat_text
+                    break
             
-            # Если не нашли категорию, ищем в тексте блока
+            # Если не нашли категорию, ищем в тексте блока (по приоритету)
             if category == "Не указана":
-                block_text = block.get_text()
-                if 'Разработка' in block_text:
-                    category = 'Разработка'
-                elif 'Дизайн' in block_text:
-                    category = 'Дизайн'
-                elif 'AI - искусственный интеллект' in block_text:
-                    category = 'AI - искусственный интеллект'
-                elif 'SEO продвижение' in block_text:
-                    category = 'SEO продвижение'
-                elif 'Программирование' in block_text:
-                    category = 'Программирование'
+                if block_text is None:
+                    block_text = block.text_content()
+                category = next((name for name in FALLBACK_CATEGORIES if name in block_text), category)
             
-            # 5. Извлекаем время публикации из блока с иконкой schedule
-            published = "Недавно"
-            # Ищем блок с иконками visibility и schedule
-            stats_containers = block.find_all('div', class_=['flex', 'items-center', 'text-sm', 'text-gray-500'])
-            for stats_container in stats_containers:
-                if 'gap-4' in stats_container.get('class', []) and 'mb-4' in stats_container.get('class', []):
-                    # Ищем иконку schedule (может быть как текст, так и material icon)
-                    schedule_icons = stats_container.find_all('span', class_='material-symbols-outlined')
-                    for icon in schedule_icons:
-                        if icon.get_text(strip=True) == 'schedule':
-                            # Следующий элемент после иконки - время
-                            next_p = icon.find_next_sibling('p')
-                            if next_p:
-                                time_text = next_p.get_text(strip=True)
-                                # Проверяем, что это действительно время
-                                if any(word in time_text for word in ['назад', 'час', 'день', 'дня', 'дней', 'минут', 'минуту']):
-                                    published = time_text
-                                    break
-                    
-                    # Если нашли время, выходим из внешнего цикла
-                    if published != "Недавно":
-                        break
-            
-            # ДОПОЛНИТЕЛЬНЫЕ МЕТОДЫ поиска времени если основной не сработал
-            if published == "Недавно":
-                # Метод 2: Ищем все p элементы с временными индикаторами
-                all_p = block.find_all('p')
-                for p in all_p:
-                    p_text = p.get_text(strip=True)
-                    if any(word in p_text for word in ['назад', 'час', 'день', 'дня', 'дней', 'минут', 'минуту', 'секунд']) and len(p_text) < 50:
-                        # Проверяем, что это не другие данные
-                        if not any(skip in p_text for skip in ['₽', 'руб', 'категори', title, 'просмотр', 'коммент']):
-                            published = p_text
-                            break
-                
-                # Метод 3: Ищем среди всех элементов с материальными иконками
-                if published == "Недавно":
-                    all_material_icons = block.find_all('span', class_='material-symbols-outlined')
-                    for icon in all_material_icons:
-                        if 'schedule' in icon.get_text():
-                            # Ищем следующий элемент с временем
-                            parent = icon.parent
-                            if parent:
-                                next_elements = parent.find_all('p')
-                                for elem in next_elements:
-                                    elem_text = elem.get_text(strip=True)
-                                    if any(word in elem_text for word in ['назад', 'час', 'день', 'дня', 'дней', 'минут', 'минуту']):
-                                        published = elem_text
-                                        break
-                            if published != "Недавно":
-                                break
-                
-                # Если всё ещё не нашли, ищем в span с "был(а)"
-                if published == "Недавно":
-                    status_spans = block.find_all('span', class_='text-gray-500')
-                    for span in status_spans:
-                        span_text = span.get_text(strip=True)
-                        if 'был(а)' in span_text:
-                            # Извлекаем временную часть после "был(а)"
-                            parts = span_text.split('был(а)')
-                            if len(parts) > 1:
-                                time_part = parts[1].strip()
-                                if time_part and ('час' in time_part or 'день' in time_part or 'недавно' in time_part):
-                                    published = time_part
-                                    break
+            # 5. Извлекаем время публикации: способы поиска по убыванию надёжности,
+            # каждый - один XPath запрос, возвращающий текст первого подходящего узла
+            published = self._first_match('published', _XP_PUBLISHED, block, title=title) or "Недавно"
             
             # 6. Извлекаем описание из p с классом text-gray-700
             description = ""
-            desc_element = block.find('p', class_=['text-sm', 'text-gray-700', 'mb-4', 'break-words'])
-            if desc_element:
-                description = desc_element.get_text(strip=True)
+            desc_elements = _XP_DESCRIPTION(block)
+            if desc_elements:
+                description = _node_text(desc_elements[0])
             
             # Укорачиваем описание если слишком длинное
             if len(description) > 200:
@@ -455,14 +645,48 @@ class FreelanceSpaceParserSimple:
                 'author': author,
                 'published': published,
                 'url': url,
-                'source': 'freelancespace.ru'
+                'source': SOURCE
             }
             
         except Exception as e:
             self.logger.error(f"Ошибка при извлечении данных заказа: {str(e)}")
             return None
     
+    def _first_match(self, field: str, candidates: Tuple[XPath, ...], block, **variables) -> str:
+        """
+        Текст первого сработавшего XPath из кандидатов
+        
+        Первым пробуется XPath, сработавший для этого поля в прошлый раз: блоки на странице
+        свёрстаны одинаково, поэтому обычно хватает одного запроса вместо перебора всех способов.
+        
+        Args:
+            field: Название поля (ключ кэша)
+            candidates: XPath выражения в порядке приоритета
+            variables: Переменные XPath ($title и т.п.)
+        """
+        cached = self._xpath_cache.get(field)
+        if cached is not None:
+            result = cached(block, **variables)
+            if result:
+                return result
+        
+        for xpath in candidates:
+            if xpath is cached:
+                continue
+            result = xpath(block, **variables)
+            if result:
+                self._xpath_cache[field] = xpath
+                return result
+        
+        return ''
+    
     def get_new_orders(self, max_pages: int = None) -> List[Dict]:
+        """
+        Получение только новых заказов (синхронная обёртка над aget_new_orders)
+        """
+        return asyncio.run(self.aget_new_orders(max_pages))
+    
+    async def aget_new_orders(self, max_pages: int = None) -> List[Dict]:
         """
         Получение только новых заказов (которые ещё не отправлялись)
         
@@ -478,7 +702,7 @@ class FreelanceSpaceParserSimple:
             self.logger.info(f"🚀 Режим производительности: {PERFORMANCE_MODE.get('description', 'Неизвестный')}")
         
         # ОПТИМИЗАЦИЯ: парсим количество страниц согласно настройкам производительности
-        all_orders = self.parse_orders(max_pages=max_pages)
+        all_orders = await self.aparse_orders(max_pages=max_pages)
         new_orders = []
         
         for order in all_orders:
@@ -500,39 +724,9 @@ class FreelanceSpaceParserSimple:
         Returns:
             Отсортированный список заказов
         """
-        def time_to_minutes(time_str: str) -> int:
-            """Преобразование времени в минуты для сортировки"""
-            if not time_str or time_str == "Недавно":
-                return 0  # Самые новые - 0 минут
-            
-            time_str = time_str.lower()
-            
-            # Извлекаем число из строки
-            import re
-            numbers = re.findall(r'\d+', time_str)
-            if not numbers:
-                return 0
-                
-            num = int(numbers[0])
-            
-            # Преобразуем в минуты
-            if 'секунд' in time_str:
-                return max(1, num // 60)  # Секунды -> минуты (минимум 1)
-            elif 'минут' in time_str:
-                return num
-            elif 'час' in time_str:
-                return num * 60
-            elif 'день' in time_str or 'дня' in time_str or 'дней' in time_str:
-                return num * 24 * 60
-            elif 'недел' in time_str:
-                return num * 7 * 24 * 60
-            elif 'месяц' in time_str:
-                return num * 30 * 24 * 60
-            else:
-                return 0  # Неизвестный формат = самые новые
-        
         try:
-            # Сортируем по убыванию времени (самые старые сначала, самые новые в конце)
+            # Сортируем по убыванию времени (самые старые сначала, самые новые в конце).
+            # sorted вычисляет ключ один раз на заказ, а не при каждом сравнении
             sorted_orders = sorted(orders, key=lambda x: time_to_minutes(x.get('published', '')), reverse=True)
             
             # Логируем результат сортировки
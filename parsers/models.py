@@ -0,0 +1,27 @@
+"""
+Модель заказа с фиксированным набором полей
+"""
+
+from typing import Dict, NamedTuple
+
+class Order(NamedTuple):
+    """
+    Заказ с фриланс площадки (неизменяемый кортеж без __dict__ у экземпляров)
+
+    Значения по умолчанию - тексты, которые показываются в уведомлении вместо пустого поля.
+    """
+    id: str = ''
+    title: str = 'Без названия'
+    url: str = ''
+    source: str = 'Фриланс площадке'
+    price: str = 'Не указана'
+    category: str = 'Не указана'
+    author: str = 'Не указан'
+    published: str = 'Недавно'
+    description: str = 'Описание отсутствует'
+    parsed_at: str = ''
+
+    @classmethod
+    def from_dict(cls, order: Dict) -> 'Order':
+        """Заказ из словаря парсера (неизвестные ключи отбрасываются, отсутствующие - по умолчанию)"""
+        return cls(**{field: order[field] for field in cls._fields if field in order})
@@ -0,0 +1,52 @@
+"""
+Ограниченное хранилище ID уже отправленных заказов
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Union
+
+def order_key(order_id: Union[str, int]) -> int:
+    """
+    Компактный ключ ID заказа: число хранится как int, остальные ID - как 64-битный blake2b хэш
+    
+    Небольшой int занимает в памяти втрое меньше строки, а хэш стабилен между перезапусками.
+    """
+    if isinstance(order_id, int):
+        return order_id
+    if order_id.isdecimal():
+        return int(order_id)
+    return int.from_bytes(hashlib.blake2b(order_id.encode('utf-8'), digest_size=8).digest(), 'big')
+
+class SentOrdersCache:
+    def __init__(self, maxlen: int = 50_000):
+        """
+        Множество отправленных заказов с ограничением размера (LRU)
+        
+        При превышении maxlen вытесняются записи, которые дольше всех не встречались,
+        поэтому память не растёт бесконечно при долгой работе бота. Заказы, которые
+        всё ещё видны на страницах площадок, при каждой проверке становятся свежими
+        и не вытесняются (иначе они были бы отправлены повторно).
+        
+        Args:
+            maxlen: Максимальное количество хранимых ID
+        """
+        self.maxlen = maxlen
+        self._items = OrderedDict()
+    
+    def __contains__(self, order_id: Union[str, int]) -> bool:
+        """Проверка ID (найденная запись переносится в конец очереди вытеснения)"""
+        key = order_key(order_id)
+        if key in self._items:
+            self._items.move_to_end(key)
+            return True
+        return False
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def add(self, order_id: Union[str, int]):
+        """Добавление ID (самая давно не встречавшаяся запись вытесняется при переполнении)"""
+        self._items[order_key(order_id)] = None
+        if len(self._items) > self.maxlen:
+            self._items.popitem(last=False)
@@ -1,10 +1,21 @@
 import asyncio
 import logging
+import signal
+import time
+import aiohttp
+from collections import Counter
 from datetime import datetime
 from typing import List, Dict
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram.ext import AIORateLimiter, Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram.request import HTTPXRequest
+
+# orjson (C расширение) разбирает ответы Telegram в несколько раз быстрее стандартного json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
     from config import TELEGRAM_BOT_TOKEN, CHAT_ID, PARSE_INTERVAL, USER_AGENT, COOKIES
@@ -13,52 +24,15 @@ except ImportError:
     exit(1)
 
 from parsers.combined_parser import CombinedParser
+from parsers.models import Order
 
-class FreelanceParserBotCombined:
-    def __init__(self):
-        """Инициализация объединённого бота"""
-        self.application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
-        self.parser = CombinedParser(USER_AGENT, COOKIES)
-        self.is_parsing_active = True
-        self.last_check_time = None
-        
-        # Настройка логирования
-        logging.basicConfig(
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            level=logging.INFO
-        )
-        self.logger = logging.getLogger(__name__)
-        
-        # Регистрация обработчиков команд
-        self.setup_handlers()
-    
-    def setup_handlers(self):
-        """Настройка обработчиков команд бота"""
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("status", self.status_command))
-        self.application.add_handler(CommandHandler("parse", self.manual_parse_command))
-        self.application.add_handler(CommandHandler("toggle", self.toggle_parsing_command))
-        self.application.add_handler(CommandHandler("chatid", self.chatid_command))
-        self.application.add_handler(CommandHandler("sources", self.sources_command))
-        self.application.add_handler(CallbackQueryHandler(self.button_callback))
-    
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработчик команды /start"""
-        keyboard = [
-            [InlineKeyboardButton("📊 Статус", callback_data='status')],
-            [InlineKeyboardButton("🔍 Парсить сейчас", callback_data='parse')],
-            [InlineKeyboardButton("⏯️ Вкл/Выкл автопарсинг", callback_data='toggle')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        welcome_text = """
-🤖 **Freelance Parser Bot** (Объединённая версия)
+# Тексты команд (строятся один раз при загрузке модуля)
+WELCOME_TEXT = """🤖 **Freelance Parser Bot** (Объединённая версия)
 
 Этот бот автоматически парсит заказы с **FreelanceSpace.ru** и **FL.ru** и уведомляет о новых предложениях.
 
 **Источники:**
-• 🔹 FreelanceSpace.ru 
+• 🔹 FreelanceSpace.ru
 • 🔹 FL.ru
 
 **Особенности:**
@@ -75,19 +49,9 @@ class FreelanceParserBotCombined:
 • /sources - Статистика по источникам
 • /chatid - Показать ID чата
 
-Используйте кнопки ниже для управления ботом.
-        """
-        
-        await update.message.reply_text(
-            welcome_text,
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
-    
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработчик команды /help"""
-        help_text = """
-📚 **Помощь по использованию бота (Объединённая версия)**
+Используйте кнопки ниже для управления ботом."""
+
+HELP_TEXT = """📚 **Помощь по использованию бота (Объединённая версия)**
 
 **Основные функции:**
 • Автоматический парсинг заказов каждые 5 минут
@@ -107,63 +71,188 @@ class FreelanceParserBotCombined:
 • Без базы данных - все данные в памяти
 • При перезапуске бота может быть дублирование заказов
 • Порядок уведомлений: самый новый заказ отправляется последним
-• Автоматическая фильтрация дубликатов между источниками
-        """
-        
-        await update.message.reply_text(help_text, parse_mode='Markdown')
-    
-    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработчик команды /status"""
-        sources_info = self.parser.get_sources_info()
-        
-        status_text = f"""
-📊 **Статус парсера (Объединённая версия)**
+• Автоматическая фильтрация дубликатов между источниками"""
+
+STATUS_TEMPLATE = """📊 **Статус парсера (Объединённая версия)**
 
-🔄 Автопарсинг: {'✅ Включён' if self.is_parsing_active else '❌ Выключен'}
-⏰ Интервал: {PARSE_INTERVAL} секунд
-🕐 Последняя проверка: {self.last_check_time or 'Не выполнялась'}
+🔄 Автопарсинг: {auto_status}
+⏰ Интервал: {interval} секунд
+🕐 Последняя проверка: {last_check}
 
 📈 **Статистика:**
-• Всего отправлено заказов: {sources_info['total_sent']}
-• FreelanceSpace.ru: {sources_info['freelancespace']['sent_orders']} заказов
-• FL.ru: {sources_info['fl']['sent_orders']} заказов
+• Всего отправлено заказов: {total_sent}
+• FreelanceSpace.ru: {freelancespace_sent} заказов
+• FL.ru: {fl_sent} заказов
 
 **Настройки:**
 • Хранение: В памяти (без БД)
 • Источники: FreelanceSpace.ru + FL.ru
-• Порядок: Самый новый заказ отправляется последним
-        """
-        
-        # Поддержка как обычных команд, так и callback кнопок
-        if update.callback_query:
-            await update.callback_query.edit_message_text(status_text, parse_mode='Markdown')
-        else:
-            await update.message.reply_text(status_text, parse_mode='Markdown')
-    
-    async def sources_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработчик команды /sources - статистика по источникам"""
-        sources_info = self.parser.get_sources_info()
-        
-        sources_text = f"""
-📊 **Статистика по источникам**
+• Порядок: Самый новый заказ отправляется последним"""
+
+SOURCES_TEMPLATE = """📊 **Статистика по источникам**
 
 🔹 **FreelanceSpace.ru**
-• Отправлено заказов: {sources_info['freelancespace']['sent_orders']}
+• Отправлено заказов: {freelancespace_sent}
 • URL: https://freelancespace.ru
 
-🔹 **FL.ru**  
-• Отправлено заказов: {sources_info['fl']['sent_orders']}
+🔹 **FL.ru**
+• Отправлено заказов: {fl_sent}
 • URL: https://fl.ru/projects/category/programmirovanie/
 
 📈 **Общая статистика:**
-• Всего отправлено: {sources_info['total_sent']} заказов
+• Всего отправлено: {total_sent} заказов
 • Средний чек: смешанный (зависит от источника)
 • Конкуренция: высокая на обеих площадках
 
 💡 **Рекомендации:**
 • Следите за FL.ru - там часто более высокие бюджеты
-• FreelanceSpace.ru - больше начинающих заказчиков
+• FreelanceSpace.ru - больше начинающих заказчиков"""
+
+# Клавиатура главного меню (объекты telegram неизменяемы, одна на все /start)
+START_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Статус", callback_data='status')],
+    [InlineKeyboardButton("🔍 Парсить сейчас", callback_data='parse')],
+    [InlineKeyboardButton("⏯️ Вкл/Выкл автопарсинг", callback_data='toggle')]
+])
+
+# Эмодзи источника в уведомлениях
+SOURCE_EMOJI = {'FreelanceSpace.ru': '🔹', 'FL.ru': '🔸'}
+
+# Шаблон уведомления о заказе (разбирается один раз при загрузке модуля)
+NOTIFICATION_TEMPLATE = """🆕 **Новый заказ на {source}** {emoji}
+
+📋 **{title}**
+
+💰 **Цена:** {price}
+📂 **Категория:** {category}
+👤 **Автор:** {author}
+🕐 **Опубликовано:** {published}
+
+📝 **Описание:**
+{description}
+
+🔗 **Источник:** {source}"""
+
+# Экранирование спецсимволов Markdown (legacy) в полях заказа: одна таблица для str.translate,
+# замена выполняется в C за один проход по строке
+_MARKDOWN_ESCAPE = str.maketrans({char: '\\' + char for char in '_*`['})
+
+def escape_markdown(text) -> str:
+    """Экранирование текста заказа для parse_mode='Markdown'"""
+    return str(text).translate(_MARKDOWN_ESCAPE)
+
+# Сколько секунд при остановке ждать отправки уведомлений, оставшихся в очереди
+SEND_DRAIN_TIMEOUT = 30
+
+class OrjsonRequest(HTTPXRequest):
+    """HTTPXRequest, разбирающий JSON ответы Telegram через orjson"""
+    
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> Dict:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # Битый UTF-8 или JSON - стандартный разбор (с заменой символов и TelegramError)
+            return HTTPXRequest.parse_json_payload(payload)
+
+class FreelanceParserBotCombined:
+    def __init__(self):
+        """Инициализация объединённого бота"""
+        # Обновления от разных пользователей обрабатываются одновременно, а все запросы к Bot API
+        # проходят через ограничитель частоты (лимит Telegram, повтор при 429 Too Many Requests)
+        builder = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .concurrent_updates(True)
+            .rate_limiter(AIORateLimiter(overall_max_rate=30, overall_time_period=1, max_retries=3))
+        )
+        if orjson is not None:
+            # Параметры задаются явно, как у запросов, которые строит сам ApplicationBuilder:
+            # в ранних PTB 20.x у HTTPXRequest по умолчанию пул из одного соединения
+            builder = builder.request(
+                OrjsonRequest(connection_pool_size=256, read_timeout=5.0, write_timeout=5.0,
+                              connect_timeout=5.0, pool_timeout=1.0)
+            ).get_updates_request(
+                OrjsonRequest(connection_pool_size=1, read_timeout=5.0, write_timeout=5.0,
+                              connect_timeout=5.0, pool_timeout=1.0)
+            )
+        self.application = builder.build()
+        self.parser = CombinedParser(USER_AGENT, COOKIES)
+        self.http_session = None  # Общая aiohttp сессия, создаётся в run() внутри цикла событий
+        self._outq = None  # Очередь заказов на отправку (номер, всего в пачке, заказ), создаётся в run()
+        self._sender_task = None  # Единственный обработчик очереди: уведомления приходят в чат по порядку
+        self._parse_job = None  # Задача автопарсинга в JobQueue (None - автопарсинг не запланирован)
+        
+        # Обработчики inline кнопок по callback_data
+        self._callback_routes = {
+            'status': self.status_command,
+            'parse': self.manual_parse_command,
+            'toggle': self.toggle_parsing_command,
+        }
+        self.is_parsing_active = True
+        self.last_check_time = None
+        
+        self.logger = logging.getLogger(__name__)
+        
+        # Регистрация обработчиков команд
+        self.setup_handlers()
+    
+    def setup_handlers(self):
         """
+        Настройка обработчиков команд бота
+        
+        block=False: обработчик выполняется отдельной задачей, поэтому долгий /parse
+        не задерживает /status и нажатия кнопок
+        """
+        self.application.add_handler(CommandHandler("start", self.start_command, block=False))
+        self.application.add_handler(CommandHandler("help", self.help_command, block=False))
+        self.application.add_handler(CommandHandler("status", self.status_command, block=False))
+        self.application.add_handler(CommandHandler("parse", self.manual_parse_command, block=False))
+        self.application.add_handler(CommandHandler("toggle", self.toggle_parsing_command, block=False))
+        self.application.add_handler(CommandHandler("chatid", self.chatid_command, block=False))
+        self.application.add_handler(CommandHandler("sources", self.sources_command, block=False))
+        self.application.add_handler(CallbackQueryHandler(self.button_callback, block=False))
+    
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /start"""
+        await update.message.reply_text(
+            WELCOME_TEXT,
+            reply_markup=START_KEYBOARD,
+            parse_mode='Markdown'
+        )
+    
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /help"""
+        await update.message.reply_text(HELP_TEXT, parse_mode='Markdown')
+    
+    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /status"""
+        sources_info = self.parser.get_sources_info()
+        
+        status_text = STATUS_TEMPLATE.format(
+            auto_status='✅ Включён' if self.is_parsing_active else '❌ Выключен',
+            interval=PARSE_INTERVAL,
+            last_check=self.last_check_time or 'Не выполнялась',
+            total_sent=sources_info['total_sent'],
+            freelancespace_sent=sources_info['freelancespace']['sent_orders'],
+            fl_sent=sources_info['fl']['sent_orders'],
+        )
+        
+        # Поддержка как обычных команд, так и callback кнопок
+        if update.callback_query:
+            await update.callback_query.edit_message_text(status_text, parse_mode='Markdown')
+        else:
+            await update.message.reply_text(status_text, parse_mode='Markdown')
+    
+    async def sources_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /sources - статистика по источникам"""
+        sources_info = self.parser.get_sources_info()
+        
+        sources_text = SOURCES_TEMPLATE.format(
+            total_sent=sources_info['total_sent'],
+            freelancespace_sent=sources_info['freelancespace']['sent_orders'],
+            fl_sent=sources_info['fl']['sent_orders'],
+        )
         
         await update.message.reply_text(sources_text, parse_mode='Markdown')
     
@@ -175,12 +264,11 @@ class FreelanceParserBotCombined:
         else:
             await update.message.reply_text("🚀 Запускаю быстрый парсинг двух источников...")
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         try:
             new_orders = await self.parse_and_notify()
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             
             sources_info = self.parser.get_sources_info()
             
@@ -201,7 +289,7 @@ class FreelanceParserBotCombined:
                 await update.callback_query.message.reply_text(error_text)
             else:
                 await update.message.reply_text(error_text)
-            self.logger.error(f"Ошибка парсинга: {str(e)}")
+            self.logger.error("Ошибка парсинга: %s", e)
     
     async def toggle_parsing_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /toggle - включение/выключение автопарсинга"""
@@ -219,12 +307,14 @@ class FreelanceParserBotCombined:
         
         if self.is_parsing_active:
             self.schedule_parsing()
+        else:
+            self.stop_parsing()
 
     async def chatid_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /chatid - получение ID чата"""
         chat_id = update.effective_chat.id
         chat_type = update.effective_chat.type
-        chat_title = getattr(update.effective_chat, 'title', 'Не указано')
+        chat_title = update.effective_chat.title or 'Не указано'
         
         info_text = f"""
 🆔 **Информация о чате**
@@ -245,152 +335,216 @@ class FreelanceParserBotCombined:
         query = update.callback_query
         await query.answer()
         
-        if query.data == 'status':
-            await self.status_command(update, context)
-        elif query.data == 'parse':
-            await self.manual_parse_command(update, context)
-        elif query.data == 'toggle':
-            await self.toggle_parsing_command(update, context)
+        handler = self._callback_routes.get(query.data)
+        if handler:
+            await handler(update, context)
     
-    async def parse_and_notify(self) -> List[Dict]:
+    async def parse_and_notify(self) -> List[Order]:
         """Парсинг заказов и отправка уведомлений о новых (ОБЪЕДИНЁННАЯ ВЕРСИЯ)"""
         try:
-            parse_start = datetime.now()
+            parse_start = time.perf_counter()
+            
+            # Источники парсятся одновременно: время парсинга - максимум, а не сумма по источникам
+            freelancespace_orders, fl_orders = await asyncio.gather(
+                self.parser.get_freelancespace_orders(),
+                self.parser.get_fl_orders(),
+                return_exceptions=True
+            )
             
-            # Получаем только новые заказы со всех источников
-            new_orders = self.parser.get_new_orders()
+            # Объединение, удаление дубликатов и сортировка (самый новый в конце)
+            new_orders = self.parser.merge_orders(freelancespace_orders, fl_orders)
             
-            parse_end = datetime.now()
-            parse_duration = (parse_end - parse_start).total_seconds()
+            parse_end = time.perf_counter()
+            parse_duration = parse_end - parse_start
             
             if not new_orders:
-                self.logger.info(f"ℹ️ Новых заказов не найдено (парсинг за {parse_duration:.1f}с)")
+                self.logger.info("ℹ️ Новых заказов не найдено (парсинг за %.1fс)", parse_duration)
                 return []
             
-            send_start = datetime.now()
-            self.logger.info(f"🚀 Отправка {len(new_orders)} заказов из двух источников (парсинг за {parse_duration:.1f}с)...")
+            self.logger.info("🚀 Отправка %d заказов из двух источников (парсинг за %.1fс)...", len(new_orders), parse_duration)
             
             # Группировка по источникам для логирования
-            freelancespace_count = len([o for o in new_orders if o.get('source') == 'FreelanceSpace.ru'])
-            fl_count = len([o for o in new_orders if o.get('source') == 'FL.ru'])
+            source_counts = Counter(order.source for order in new_orders)
             
-            self.logger.info(f"📤 FreelanceSpace.ru: {freelancespace_count}, FL.ru: {fl_count}")
+            self.logger.info("📤 FreelanceSpace.ru: %d, FL.ru: %d", source_counts['FreelanceSpace.ru'], source_counts['FL.ru'])
             
-            # ПОСЛЕДОВАТЕЛЬНАЯ отправка для сохранения порядка (самый новый в конце)
+            # Заказы уходят в очередь по порядку (самый новый в конце) и отправляются обработчиками
+            # очереди в фоне: следующий цикл парсинга не ждёт хвоста отправки
             for i, order in enumerate(new_orders, 1):
-                try:
-                    await self.send_order_notification(order)
-                    source_emoji = "🔹" if order.get('source') == 'FreelanceSpace.ru' else "🔸"
-                    self.logger.info(f"📨 {i}/{len(new_orders)}: {source_emoji} {order.get('title', 'Без названия')[:30]}... ({order.get('published', 'Неизвестно')})")
-                except Exception as e:
-                    self.logger.error(f"❌ Ошибка отправки заказа {i}: {str(e)}")
-                    continue
-            
-            send_end = datetime.now()
-            send_duration = (send_end - send_start).total_seconds()
-            total_duration = (send_end - parse_start).total_seconds()
+                self._outq.put_nowait((i, len(new_orders), order))
             
             self.last_check_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.logger.info(f"⚡ ИТОГО: {len(new_orders)} заказов за {total_duration:.1f}с (парсинг: {parse_duration:.1f}с, отправка: {send_duration:.1f}с, скорость: {len(new_orders)/total_duration:.1f} заказов/сек)")
+            self.logger.info("⚡ ИТОГО: %d заказов поставлено в очередь отправки за %.1fс (в очереди: %d)",
+                             len(new_orders), parse_duration, self._outq.qsize())
             return new_orders
             
         except Exception as e:
-            self.logger.error(f"Ошибка при парсинге и уведомлении: {str(e)}")
+            self.logger.error("Ошибка при парсинге и уведомлении: %s", e)
             return []
     
-    async def send_order_notification(self, order: Dict):
-        """Отправка уведомления о новом заказе"""
+    async def _sender_loop(self):
+        """
+        Обработчик очереди отправки: заказы отправляются строго по одному в порядке постановки
+        
+        Параллельные отправки приходили бы в чат в произвольном порядке, а самый новый заказ
+        должен быть последним. Частоту запросов ограничивает AIORateLimiter приложения.
+        """
+        while True:
+            i, total, order = await self._outq.get()
+            try:
+                await self._submit(order, i, total)
+            finally:
+                self._outq.task_done()
+    
+    async def _drain_send_queue(self):
+        """
+        Ожидание отправки уведомлений, оставшихся в очереди (не дольше SEND_DRAIN_TIMEOUT)
+        
+        Заказы в очереди уже отмечены как отправленные и повторно не придут, поэтому
+        недоставленные при остановке попадают в лог (один раз - при отмене обработчика в run()).
+        """
         try:
-            source_emoji = "🔹" if order.get('source') == 'FreelanceSpace.ru' else "🔸"
-            
-            text = f"""
-🆕 **Новый заказ на {order.get('source', 'Фриланс площадке')}** {source_emoji}
-
-📋 **{order.get('title', 'Без названия')}**
-
-💰 **Цена:** {order.get('price', 'Не указана')}
-📂 **Категория:** {order.get('category', 'Не указана')}
-👤 **Автор:** {order.get('author', 'Не указан')}
-🕐 **Опубликовано:** {order.get('published', 'Недавно')}
-
-📝 **Описание:**
-{order.get('description', 'Описание отсутствует')}
-
-🔗 **Источник:** {order.get('source', 'freelancespace.ru')}
-            """
-            
-            # Создаём inline кнопку для перехода к заказу
-            keyboard = []
-            order_url = order.get('url')
-            if order_url:
-                keyboard.append([InlineKeyboardButton("🔗 Перейти к заказу", url=order_url)])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
-            
-            await self.application.bot.send_message(
-                chat_id=CHAT_ID,
-                text=text,
-                parse_mode='Markdown',
-                reply_markup=reply_markup
-            )
-            
+            await asyncio.wait_for(self._outq.join(), timeout=SEND_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _submit(self, order: Order, i: int, total: int):
+        """Отправка одного заказа с логированием результата"""
+        try:
+            await self.send_order_notification(order)
+            self.logger.info("📨 %d/%d: %s %.30s... (%s)", i, total, SOURCE_EMOJI.get(order.source, '🔸'),
+                             order.title, order.published)
         except Exception as e:
-            self.logger.error(f"Ошибка при отправке уведомления: {str(e)}")
+            self.logger.error("❌ Ошибка отправки заказа %d: %s", i, e)
+    
+    async def send_order_notification(self, order: Order):
+        """Отправка уведомления о новом заказе (ошибка отправки передаётся вызывающему)"""
+        text = NOTIFICATION_TEMPLATE.format(
+            source=escape_markdown(order.source),
+            emoji=SOURCE_EMOJI.get(order.source, '🔸'),
+            title=escape_markdown(order.title),
+            price=escape_markdown(order.price),
+            category=escape_markdown(order.category),
+            author=escape_markdown(order.author),
+            published=escape_markdown(order.published),
+            description=escape_markdown(order.description),
+        )
+        
+        # Inline кнопка для перехода к заказу (только если есть ссылка)
+        reply_markup = InlineKeyboardMarkup(
+            [[InlineKeyboardButton("🔗 Перейти к заказу", url=order.url)]]
+        ) if order.url else None
+        
+        await self.application.bot.send_message(
+            chat_id=CHAT_ID,
+            text=text,
+            parse_mode='Markdown',
+            reply_markup=reply_markup
+        )
     
     def schedule_parsing(self):
-        """Настройка планировщика для автоматического парсинга"""
-        async def periodic_parse():
-            """Периодический парсинг"""
-            while self.is_parsing_active:
-                try:
-                    self.logger.info("🔄 Запуск автоматического парсинга двух источников...")
-                    new_orders = await self.parse_and_notify()
-                    if new_orders:
-                        sources_info = self.parser.get_sources_info()
-                        self.logger.info(f"✅ Найдено {len(new_orders)} новых заказов (FS: {sources_info['freelancespace']['sent_orders']}, FL: {sources_info['fl']['sent_orders']})")
-                    else:
-                        self.logger.info("ℹ️ Новых заказов не найдено")
-                except Exception as e:
-                    self.logger.error(f"❌ Ошибка при автопарсинге: {str(e)}")
-                
-                # Ждём интервал перед следующим парсингом
-                await asyncio.sleep(PARSE_INTERVAL)
+        """Настройка планировщика для автоматического парсинга (повторяющаяся задача JobQueue)"""
+        if self._parse_job is not None:
+            return  # Уже запланирован: повторное включение не создаёт второй цикл
         
-        # Запускаем периодический парсинг как задачу
-        asyncio.create_task(periodic_parse())
+        self._parse_job = self.application.job_queue.run_repeating(
+            self.periodic_parse,
+            interval=PARSE_INTERVAL,
+            first=0,
+            name="periodic_parse"
+        )
+    
+    def stop_parsing(self):
+        """Отмена автоматического парсинга"""
+        if self._parse_job is not None:
+            self._parse_job.schedule_removal()
+            self._parse_job = None
+    
+    async def periodic_parse(self, context: ContextTypes.DEFAULT_TYPE):
+        """Периодический парсинг (один запуск по расписанию JobQueue)"""
+        try:
+            self.logger.info("🔄 Запуск автоматического парсинга двух источников...")
+            new_orders = await self.parse_and_notify()
+            if new_orders:
+                sources_info = self.parser.get_sources_info()
+                self.logger.info("✅ Найдено %d новых заказов (FS: %d, FL: %d)", len(new_orders),
+                                 sources_info['freelancespace']['sent_orders'], sources_info['fl']['sent_orders'])
+            else:
+                self.logger.info("ℹ️ Новых заказов не найдено")
+        except Exception as e:
+            self.logger.error("❌ Ошибка при автопарсинге: %s", e)
     
     async def run(self):
         """Запуск бота"""
         self.logger.info("🚀 Запуск Freelance Parser Bot (Объединённая версия)...")
         
-        # Запуск автопарсинга, если он включён
-        if self.is_parsing_active:
-            self.schedule_parsing()
-        
-        # Запуск бота
-        await self.application.initialize()
-        await self.application.start()
-        await self.application.updater.start_polling()
+        # Одна сессия на всё время работы: пул keep-alive соединений и DNS кэш
+        # переиспользуются между циклами парсинга и источниками
+        self.http_session = aiohttp.ClientSession(
+            headers={'User-Agent': USER_AGENT},
+            cookies=COOKIES,
+            connector=aiohttp.TCPConnector(limit=20, limit_per_host=10, ttl_dns_cache=300, keepalive_timeout=60)
+        )
+        self.parser.session = self.http_session
         
-        self.logger.info("✅ Бот успешно запущен!")
+        # Очередь и обработчик отправки уведомлений
+        self._outq = asyncio.Queue()
+        self._sender_task = asyncio.create_task(self._sender_loop())
         
-        # Ожидание завершения
         try:
-            await self.application.updater.idle()
-        except AttributeError:
-            import signal
-            stop_event = asyncio.Event()
+            # Запуск бота
+            await self.application.initialize()
+            await self.application.start()
+            await self.application.updater.start_polling()
             
-            def signal_handler():
-                stop_event.set()
+            # Запуск автопарсинга, если он включён (JobQueue запускается вместе с приложением)
+            if self.is_parsing_active:
+                self.schedule_parsing()
             
+            self.logger.info("✅ Бот успешно запущен!")
+            
+            # Ожидание сигнала завершения (в PTB 20+ у Updater нет idle())
+            stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            installed = []
             for sig in (signal.SIGTERM, signal.SIGINT):
-                signal.signal(sig, lambda s, f: signal_handler())
+                try:
+                    loop.add_signal_handler(sig, stop_event.set)
+                    installed.append(sig)
+                except NotImplementedError:
+                    # Windows: обработчики сигналов в цикле событий не поддерживаются
+                    signal.signal(sig, lambda s, f: loop.call_soon_threadsafe(stop_event.set))
+            
+            try:
+                await stop_event.wait()
+            finally:
+                for sig in installed:
+                    loop.remove_signal_handler(sig)
+            
+            self.logger.info("🛑 Остановка бота...")
+            await self.application.updater.stop()
+            await self.application.stop()  # Дожидается текущего парсинга в JobQueue
             
-            await stop_event.wait()
+            # Бот ещё может отправлять сообщения: досылаем очередь до shutdown()
+            await self._drain_send_queue()
+            await self.application.shutdown()
+        finally:
+            if self._outq.qsize():
+                self.logger.warning("⚠️ Остановка: потеряно %d уведомлений из очереди", self._outq.qsize())
+            self._sender_task.cancel()
+            await asyncio.gather(self._sender_task, return_exceptions=True)
+            
+            self.parser.session = None
+            await self.http_session.close()
 
 def main():
     """Главная функция запуска"""
+    # Настройка логирования (один раз для всего приложения, включая парсеры)
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    
     bot = FreelanceParserBotCombined()
     
     try:
@@ -1,10 +1,23 @@
 import asyncio
 import logging
+import logging.handlers
+import queue
+import signal
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import List, Dict
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+import aiohttp
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, LinkPreviewOptions
+from telegram.ext import (Application, ApplicationHandlerStop, CommandHandler, CallbackQueryHandler,
+                          ContextTypes, Defaults, TypeHandler)
+
+# uvloop (цикл событий на libuv) быстрее стандартного asyncio; на Windows недоступен
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 try:
     from config import TELEGRAM_BOT_TOKEN, CHAT_ID, PARSE_INTERVAL, USER_AGENT, COOKIES
@@ -12,47 +25,27 @@ except ImportError:
     print("⚠️ Файл config.py не найден! Создайте его на основе config_example.py")
     exit(1)
 
+# Необязательные настройки (в старых config.py их может не быть)
+try:
+    from config import SENT_ORDERS_LIMIT
+except ImportError:
+    SENT_ORDERS_LIMIT = 10_000
+
+try:
+    from config import WEBHOOK_URL, WEBHOOK_PORT
+except ImportError:
+    WEBHOOK_URL, WEBHOOK_PORT = '', 8443  # Без WEBHOOK_URL бот работает через long-polling
+
+try:
+    from config import BATCH_NOTIFICATIONS
+except ImportError:
+    BATCH_NOTIFICATIONS = False  # Без настройки - как раньше, каждый заказ отдельным сообщением
+
+from parsers.timeparse import time_to_minutes
 from parsers.freelancespace_parser_simple import FreelanceSpaceParserSimple
 
-class FreelanceParserBotSimple:
-    def __init__(self):
-        """Инициализация упрощённого бота"""
-        self.application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
-        self.parser = FreelanceSpaceParserSimple(USER_AGENT, COOKIES)
-        self.is_parsing_active = True
-        self.last_check_time = None
-        
-        # Настройка логирования
-        logging.basicConfig(
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            level=logging.INFO
-        )
-        self.logger = logging.getLogger(__name__)
-        
-        # Регистрация обработчиков команд
-        self.setup_handlers()
-    
-    def setup_handlers(self):
-        """Настройка обработчиков команд бота"""
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("status", self.status_command))
-        self.application.add_handler(CommandHandler("parse", self.manual_parse_command))
-        self.application.add_handler(CommandHandler("toggle", self.toggle_parsing_command))
-        self.application.add_handler(CommandHandler("chatid", self.chatid_command))
-        self.application.add_handler(CallbackQueryHandler(self.button_callback))
-    
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработчик команды /start"""
-        keyboard = [
-            [InlineKeyboardButton("📊 Статус", callback_data='status')],
-            [InlineKeyboardButton("🔍 Парсить сейчас", callback_data='parse')],
-            [InlineKeyboardButton("⏯️ Вкл/Выкл автопарсинг", callback_data='toggle')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        welcome_text = """
-🤖 **Freelance Parser Bot** (Простая версия)
+# Тексты команд (строятся один раз при загрузке модуля)
+WELCOME_TEXT = """🤖 **Freelance Parser Bot** (Простая версия)
 
 Этот бот автоматически парсит заказы с FreelanceSpace.ru и уведомляет о новых предложениях.
 
@@ -68,19 +61,9 @@ class FreelanceParserBotSimple:
 • /toggle - Включить/выключить автопарсинг
 • /chatid - Показать ID чата
 
-Используйте кнопки ниже для управления ботом.
-        """
-        
-        await update.message.reply_text(
-            welcome_text,
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
-    
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработчик команды /help"""
-        help_text = """
-📚 **Помощь по использованию бота (Простая версия)**
+Используйте кнопки ниже для управления ботом."""
+
+HELP_TEXT = """📚 **Помощь по использованию бота (Простая версия)**
 
 **Основные функции:**
 • Автоматический парсинг заказов каждые 5 минут
@@ -97,10 +80,192 @@ class FreelanceParserBotSimple:
 **Особенности простой версии:**
 • Без базы данных - все данные в памяти
 • При перезапуске бота может быть дублирование заказов
-• Порядок уведомлений: самый новый заказ отправляется последним
+• Порядок уведомлений: самый новый заказ отправляется последним"""
+
+# Клавиатура главного меню (объекты telegram неизменяемы, одна на все /start)
+START_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Статус", callback_data='status')],
+    [InlineKeyboardButton("🔍 Парсить сейчас", callback_data='parse')],
+    [InlineKeyboardButton("⏯️ Вкл/Выкл автопарсинг", callback_data='toggle')]
+])
+
+# Шаблон уведомления о заказе (разбирается один раз при загрузке модуля)
+NOTIFICATION_TEMPLATE = """🆕 **Новый заказ на {source}**
+
+📋 **{title}**
+
+💰 **Цена:** {price}
+📂 **Категория:** {category}
+👤 **Автор:** {author}
+🕐 **Опубликовано:** {published}
+
+📝 **Описание:**
+{description}
+
+🔗 **Источник:** {source}"""
+
+# Значения полей, которых нет в заказе
+ORDER_DEFAULTS = {
+    'source': 'FreelanceSpace.ru',
+    'title': 'Без названия',
+    'price': 'Не указана',
+    'category': 'Не указана',
+    'author': 'Не указан',
+    'published': 'Недавно',
+    'description': 'Описание отсутствует',
+}
+
+# Максимальная длина полей в уведомлении после экранирования (лимит сообщения Telegram - 4096 символов)
+FIELD_LIMITS = {
+    'title': 200,
+    'description': 3500,
+}
+
+# Символы разметки Markdown, которые в тексте заказа должны выводиться как есть
+_MARKDOWN_ESCAPE = str.maketrans({char: '\\' + char for char in '_*`['})
+
+def escape_markdown(text) -> str:
+    """Экранирование текста заказа для parse_mode='Markdown'"""
+    return str(text).translate(_MARKDOWN_ESCAPE)
+
+def format_order(order: Dict) -> str:
+    """Текст уведомления о заказе (поля экранируются: '_' или '*' в описании не ломают отправку)"""
+    fields = {key: escape_markdown(value) for key, value in {**ORDER_DEFAULTS, **order}.items()}
+    
+    # Слишком длинный текст Telegram отклоняет (BadRequest) - обрезаем заранее.
+    # Обрезается уже экранированный текст: экранирование может удлинить его вдвое
+    for key, limit in FIELD_LIMITS.items():
+        value = fields[key]
+        if len(value) > limit:
+            cut = value[:limit]
+            if cut.endswith('\\') and value[limit] in '_*`[':
+                cut = cut[:-1]  # Не разрываем экранированный символ
+            fields[key] = cut + '...'
+    
+    return NOTIFICATION_TEMPLATE.format_map(fields)
+
+# Сколько последних update_id помнить для отсева повторно доставленных обновлений
+SEEN_UPDATES_LIMIT = 1000
+
+# Объединение уведомлений (BATCH_NOTIFICATIONS): с какого числа новых заказов они склеиваются
+# в общие сообщения и максимальная длина такого сообщения (лимит Telegram - 4096 символов)
+BATCH_MIN_ORDERS = 10
+BATCH_TEXT_LIMIT = 3800
+BATCH_SEPARATOR = '\n\n---\n\n'
+
+# Сколько секунд при остановке ждать завершения текущего парсинга и его отправок
+PARSE_STOP_TIMEOUT = 30
+
+class _RateLimiter:
+    def __init__(self, rate: float, capacity: int):
+        """
+        Ограничитель частоты запросов (token bucket)
+        
+        Запросы идут без задержки, пока есть запас токенов, затем - равномерно со скоростью rate,
+        не упираясь в лимит Telegram (около 30 сообщений/сек) и паузы RetryAfter.
+        
+        Args:
+            rate: Скорость пополнения токенов (запросов в секунду)
+            capacity: Максимальный запас токенов (размер допустимой пачки)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = None  # Ожидающие получают токены по очереди (создаётся при первом вызове, внутри цикла событий)
+    
+    async def acquire(self):
+        """Получение токена (ожидание, если запас исчерпан)"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class FreelanceParserBotSimple:
+    def __init__(self):
+        """Инициализация упрощённого бота"""
+        # Превью ссылок не нужны ни в уведомлениях, ни в ответах на команды:
+        # без них Telegram быстрее обрабатывает каждую отправку
+        self.application = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .defaults(Defaults(link_preview_options=LinkPreviewOptions(is_disabled=True)))
+            .build()
+        )
+        self.parser = FreelanceSpaceParserSimple(USER_AGENT, COOKIES, sent_orders_limit=SENT_ORDERS_LIMIT)
+        self.http_session = None  # Общая aiohttp сессия парсера, создаётся в run() внутри цикла событий
+        self.is_parsing_active = True
+        self.last_check_time = None
+        self.limiter = _RateLimiter(rate=25, capacity=30)
+        self._seen_updates = OrderedDict()  # Последние обработанные update_id (FIFO)
+        
+        # Автопарсинг: одна задача на всё время работы, пауза/продолжение - через событие
+        # (создаются в run(), внутри цикла событий)
+        self._parse_enabled = None
+        self._parse_task = None
+        self._parse_inflight = None  # Текущий запуск парсинга (общий для всех, кто его ждёт)
+        self._stop_event = None  # Сигнал завершения (SIGTERM/SIGINT), создаётся в run()
+        
+        # Обработчики inline кнопок по callback_data
+        self._callback_routes = {
+            'status': self.status_command,
+            'parse': self.manual_parse_command,
+            'toggle': self.toggle_parsing_command,
+        }
+        
+        self.logger = logging.getLogger(__name__)
+        
+        # Регистрация обработчиков команд
+        self.setup_handlers()
+    
+    def setup_handlers(self):
+        """Настройка обработчиков команд бота"""
+        # Группа -1 проверяется раньше команд: повторно доставленное обновление дальше не идёт
+        self.application.add_handler(TypeHandler(Update, self.drop_duplicate_update), group=-1)
+        self.application.add_handler(CommandHandler("start", self.start_command))
+        self.application.add_handler(CommandHandler("help", self.help_command))
+        self.application.add_handler(CommandHandler("status", self.status_command))
+        self.application.add_handler(CommandHandler("parse", self.manual_parse_command))
+        self.application.add_handler(CommandHandler("toggle", self.toggle_parsing_command))
+        self.application.add_handler(CommandHandler("chatid", self.chatid_command))
+        self.application.add_handler(CallbackQueryHandler(self.button_callback))
+    
+    async def drop_duplicate_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
+        Отсев обновлений, которые Telegram доставил повторно (переподключение, накопившаяся очередь)
         
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        Иначе /toggle сработал бы дважды, а /parse запустил бы лишний парсинг.
+        """
+        update_id = update.update_id
+        if update_id in self._seen_updates:
+            self.logger.info("🔁 Повторное обновление %d пропущено", update_id)
+            raise ApplicationHandlerStop
+        
+        self._seen_updates[update_id] = None
+        if len(self._seen_updates) > SEEN_UPDATES_LIMIT:
+            self._seen_updates.popitem(last=False)
+    
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /start"""
+        await update.message.reply_text(
+            WELCOME_TEXT,
+            reply_markup=START_KEYBOARD,
+            parse_mode='Markdown'
+        )
+    
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработчик команды /help"""
+        await update.message.reply_text(HELP_TEXT, parse_mode='Markdown')
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /status"""
@@ -112,7 +277,7 @@ class FreelanceParserBotSimple:
 🕐 Последняя проверка: {self.last_check_time or 'Не выполнялась'}
 
 📈 **Статистика:**
-• Отправлено заказов с момента запуска: {len(self.parser.sent_orders)}
+• Отправлено заказов с момента запуска: {len(self.parser.sent_orders)} (помним последние {self.parser.sent_orders.maxlen})
 • Источники: FreelanceSpace.ru
 
 **Настройки:**
@@ -134,12 +299,11 @@ class FreelanceParserBotSimple:
         else:
             await update.message.reply_text("🚀 Запускаю быстрый парсинг...")
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         try:
             new_orders = await self.parse_and_notify()
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             
             if new_orders:
                 result_text = f"⚡ Парсинг завершён за {duration:.1f} сек! Найдено {len(new_orders)} новых заказов."
@@ -158,7 +322,7 @@ class FreelanceParserBotSimple:
                 await update.callback_query.message.reply_text(error_text)
             else:
                 await update.message.reply_text(error_text)
-            self.logger.error(f"Ошибка парсинга: {str(e)}")
+            self.logger.error("Ошибка парсинга: %s", e)
     
     async def toggle_parsing_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /toggle - включение/выключение автопарсинга"""
@@ -175,13 +339,15 @@ class FreelanceParserBotSimple:
             await update.message.reply_text(result_text)
         
         if self.is_parsing_active:
-            self.schedule_parsing()
+            self._parse_enabled.set()
+        else:
+            self._parse_enabled.clear()
 
     async def chatid_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработчик команды /chatid - получение ID чата"""
         chat_id = update.effective_chat.id
         chat_type = update.effective_chat.type
-        chat_title = getattr(update.effective_chat, 'title', 'Не указано')
+        chat_title = update.effective_chat.title or 'Не указано'
         
         info_text = f"""
 🆔 **Информация о чате**
@@ -202,83 +368,94 @@ class FreelanceParserBotSimple:
         query = update.callback_query
         await query.answer()
         
-        if query.data == 'status':
-            await self.status_command(update, context)
-        elif query.data == 'parse':
-            await self.manual_parse_command(update, context)
-        elif query.data == 'toggle':
-            await self.toggle_parsing_command(update, context)
+        handler = self._callback_routes.get(query.data)
+        if handler:
+            await handler(update, context)
     
     async def parse_and_notify(self) -> List[Dict]:
+        """
+        Парсинг заказов и отправка уведомлений о новых
+        
+        Одновременно выполняется только один парсинг: повторный /parse или автопарсинг,
+        пришедший во время работы текущего, не запускает второй, а получает его результат.
+        """
+        if self._parse_inflight is None:
+            self._parse_inflight = asyncio.ensure_future(self._parse_and_notify())
+            self._parse_inflight.add_done_callback(self._parse_finished)
+        else:
+            self.logger.info("⏳ Парсинг уже выполняется, ожидаю его результат")
+        
+        # shield: отмена одного из ожидающих не прерывает общий парсинг
+        return await asyncio.shield(self._parse_inflight)
+    
+    def _parse_finished(self, task: asyncio.Future):
+        """Сброс текущего запуска после его завершения"""
+        if self._parse_inflight is task:
+            self._parse_inflight = None
+    
+    async def _parse_and_notify(self) -> List[Dict]:
         """Парсинг заказов и отправка уведомлений о новых (УСКОРЕННАЯ ВЕРСИЯ)"""
         try:
-            parse_start = datetime.now()
+            parse_start = time.perf_counter()
             
             # Получаем только новые заказы (в обратном порядке)
-            new_orders = self.parser.get_new_orders()
+            new_orders = await self.parser.aget_new_orders()
             
-            parse_end = datetime.now()
-            parse_duration = (parse_end - parse_start).total_seconds()
+            parse_end = time.perf_counter()
+            parse_duration = parse_end - parse_start
             
             if not new_orders:
-                self.logger.info(f"ℹ️ Новых заказов не найдено (парсинг за {parse_duration:.1f}с)")
+                self.logger.info("ℹ️ Новых заказов не найдено (парсинг за %.1fс)", parse_duration)
                 return []
             
             # ПРИНУДИТЕЛЬНАЯ СОРТИРОВКА для правильного порядка отправки
             sorted_orders = self._sort_orders_by_time(new_orders)
             
-            send_start = datetime.now()
-            self.logger.info(f"🚀 Отправка {len(sorted_orders)} заказов в правильном порядке (парсинг за {parse_duration:.1f}с)...")
-            self.logger.info(f"📤 Порядок: от '{sorted_orders[0].get('published', 'Неизвестно')}' до '{sorted_orders[-1].get('published', 'Неизвестно')}'")
+            send_start = time.perf_counter()
+            self.logger.info("🚀 Отправка %d заказов в правильном порядке (парсинг за %.1fс)...", len(sorted_orders), parse_duration)
+            self.logger.info("📤 Порядок: от '%s' до '%s'", sorted_orders[0].get('published', 'Неизвестно'),
+                             sorted_orders[-1].get('published', 'Неизвестно'))
             
-            # ПОСЛЕДОВАТЕЛЬНАЯ отправка для сохранения порядка (самый новый в конце)
-            for i, order in enumerate(sorted_orders, 1):
-                try:
-                    await self.send_order_notification(order)
-                    self.logger.info(f"📨 {i}/{len(sorted_orders)}: {order.get('title', 'Без названия')[:30]}... ({order.get('published', 'Неизвестно')})")
-                except Exception as e:
-                    self.logger.error(f"❌ Ошибка отправки заказа {i}: {str(e)}")
-                    continue
+            if BATCH_NOTIFICATIONS and len(sorted_orders) >= BATCH_MIN_ORDERS:
+                # Много заказов сразу - склеиваем в несколько больших сообщений
+                await self.send_batched_notifications(sorted_orders)
+            else:
+                # Строго по одному: параллельные отправки приходят в чат в произвольном порядке,
+                # а самый новый заказ должен быть последним. Темп задаёт self.limiter
+                for i, order in enumerate(sorted_orders, 1):
+                    try:
+                        await self.send_order_notification(order)
+                        self.logger.info("📨 %d/%d: %.30s... (%s)", i, len(sorted_orders),
+                                         order.get('title', 'Без названия'), order.get('published', 'Неизвестно'))
+                    except Exception as e:
+                        self.logger.error("❌ Ошибка отправки заказа %d: %s", i, e)
             
-            send_end = datetime.now()
-            send_duration = (send_end - send_start).total_seconds()
-            total_duration = (send_end - parse_start).total_seconds()
+            send_end = time.perf_counter()
+            send_duration = send_end - send_start
+            total_duration = send_end - parse_start
             
             self.last_check_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.logger.info(f"⚡ ИТОГО: {len(sorted_orders)} заказов за {total_duration:.1f}с (парсинг: {parse_duration:.1f}с, отправка: {send_duration:.1f}с, скорость: {len(sorted_orders)/total_duration:.1f} заказов/сек)")
+            self.logger.info("⚡ ИТОГО: %d заказов за %.1fс (парсинг: %.1fс, отправка: %.1fс, скорость: %.1f заказов/сек)",
+                             len(sorted_orders), total_duration, parse_duration, send_duration,
+                             len(sorted_orders) / total_duration)
             return sorted_orders
             
         except Exception as e:
-            self.logger.error(f"Ошибка при парсинге и уведомлении: {str(e)}")
+            self.logger.error("Ошибка при парсинге и уведомлении: %s", e)
             return []
     
     async def send_order_notification(self, order: Dict):
         """Отправка уведомления о новом заказе"""
         try:
-            text = f"""
-🆕 **Новый заказ на {order.get('source', 'FreelanceSpace.ru')}**
-
-📋 **{order.get('title', 'Без названия')}**
-
-💰 **Цена:** {order.get('price', 'Не указана')}
-📂 **Категория:** {order.get('category', 'Не указана')}
-👤 **Автор:** {order.get('author', 'Не указан')}
-🕐 **Опубликовано:** {order.get('published', 'Недавно')}
-
-📝 **Описание:**
-{order.get('description', 'Описание отсутствует')}
-
-🔗 **Источник:** {order.get('source', 'freelancespace.ru')}
-            """
+            text = format_order(order)
             
-            # Создаём inline кнопку для перехода к заказу
-            keyboard = []
+            # Inline кнопка для перехода к заказу (только если есть ссылка)
             order_url = order.get('url')
-            if order_url:
-                keyboard.append([InlineKeyboardButton("🔗 Перейти к заказу", url=order_url)])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
+            reply_markup = InlineKeyboardMarkup(
+                [[InlineKeyboardButton("🔗 Перейти к заказу", url=order_url)]]
+            ) if order_url else None
             
+            await self.limiter.acquire()
             await self.application.bot.send_message(
                 chat_id=CHAT_ID,
                 text=text,
@@ -287,106 +464,209 @@ class FreelanceParserBotSimple:
             )
             
         except Exception as e:
-            self.logger.error(f"Ошибка при отправке уведомления: {str(e)}")
+            self.logger.error("Ошибка при отправке уведомления: %s", e)
     
-    def _sort_orders_by_time(self, orders: List[Dict]) -> List[Dict]:
+    async def send_batched_notifications(self, orders: List[Dict]):
         """
-        Сортировка заказов по времени публикации (самые старые сначала, самые новые в конце)
+        Отправка нескольких заказов общими сообщениями (до BATCH_TEXT_LIMIT символов в каждом)
+        
+        Один запрос к Telegram вместо отдельного на каждый заказ; у каждого заказа своя кнопка
+        перехода. Сообщения уходят по порядку, самый новый заказ - в последнем.
         """
-        def time_to_minutes(time_str: str) -> int:
-            """Преобразование времени в минуты для сортировки"""
-            if not time_str or time_str == "Недавно":
-                return 0  # Самые новые - 0 минут
+        texts, buttons, length = [], [], 0
+        
+        async def flush():
+            nonlocal texts, buttons, length
+            if texts:
+                try:
+                    await self.limiter.acquire()
+                    await self.application.bot.send_message(
+                        chat_id=CHAT_ID,
+                        text=BATCH_SEPARATOR.join(texts),
+                        parse_mode='Markdown',
+                        reply_markup=InlineKeyboardMarkup(buttons) if buttons else None
+                    )
+                    self.logger.info("📨 Отправлено сообщение с %d заказами", len(texts))
+                except Exception as e:
+                    self.logger.error("Ошибка при отправке объединённого уведомления: %s", e)
+            texts, buttons, length = [], [], 0
+        
+        for i, order in enumerate(orders, 1):
+            text = format_order(order)
             
-            time_str = time_str.lower()
+            if len(text) > BATCH_TEXT_LIMIT:
+                # Заказ сам по себе не помещается в общее сообщение - отправляем отдельно
+                await flush()
+                await self.send_order_notification(order)
+                continue
             
-            # Извлекаем число из строки
-            import re
-            numbers = re.findall(r'\d+', time_str)
-            if not numbers:
-                return 0
-                
-            num = int(numbers[0])
+            if texts and length + len(BATCH_SEPARATOR) + len(text) > BATCH_TEXT_LIMIT:
+                await flush()
             
-            # Преобразуем в минуты
-            if 'секунд' in time_str:
-                return max(1, num // 60)  # Секунды -> минуты (минимум 1)
-            elif 'минут' in time_str:
-                return num
-            elif 'час' in time_str:
-                return num * 60
-            elif 'день' in time_str or 'дня' in time_str or 'дней' in time_str:
-                return num * 24 * 60
-            elif 'недел' in time_str:
-                return num * 7 * 24 * 60
-            elif 'месяц' in time_str:
-                return num * 30 * 24 * 60
-            else:
-                return 0  # Неизвестный формат = самые новые
+            length += len(text) + (len(BATCH_SEPARATOR) if texts else 0)
+            texts.append(text)
+            
+            order_url = order.get('url')
+            if order_url:
+                title = order.get('title') or ORDER_DEFAULTS['title']
+                buttons.append([InlineKeyboardButton(f"🔗 {i}. {title[:40]}", url=order_url)])
         
+        await flush()
+    
+    def _sort_orders_by_time(self, orders: List[Dict]) -> List[Dict]:
+        """
+        Сортировка заказов по времени публикации (самые старые сначала, самые новые в конце)
+        """
         try:
             # Сортируем по убыванию времени (самые старые сначала, самые новые в конце)
-            sorted_orders = sorted(orders, key=lambda x: time_to_minutes(x.get('published', '')), reverse=True)
+            sorted_orders = sorted(orders, key=lambda order: time_to_minutes(order.get('published', '')), reverse=True)
             return sorted_orders
             
         except Exception as e:
-            self.logger.error(f"❌ Ошибка сортировки по времени: {str(e)}")
+            self.logger.error("❌ Ошибка сортировки по времени: %s", e)
             # Если сортировка не удалась, возвращаем как есть
             return orders
     
     def schedule_parsing(self):
-        """Настройка планировщика для автоматического парсинга"""
-        async def periodic_parse():
-            """Периодический парсинг"""
-            while self.is_parsing_active:
+        """
+        Запуск задачи автоматического парсинга
+        
+        Ссылка на задачу хранится (задачу без ссылок может собрать сборщик мусора), повторный вызов
+        не создаёт второй цикл, а завершившаяся с ошибкой задача перезапускается.
+        """
+        if self._parse_task is None or self._parse_task.done():
+            self._parse_task = asyncio.create_task(self.periodic_parse(), name='periodic_parse')
+    
+    async def stop_parsing(self):
+        """
+        Отмена задачи автоматического парсинга и ожидание её завершения
+        
+        Текущий парсинг защищён от отмены ожидающих (shield) и продолжает отправку уведомлений,
+        поэтому его дожидаемся (не дольше PARSE_STOP_TIMEOUT) до остановки бота и закрытия сессии.
+        """
+        if self._parse_task is not None:
+            self._parse_task.cancel()
+            await asyncio.gather(self._parse_task, return_exceptions=True)
+            self._parse_task = None
+        
+        if self._parse_inflight is not None:
+            try:
+                # По таймауту wait_for сам отменяет парсинг и дожидается отмены
+                await asyncio.wait_for(self._parse_inflight, timeout=PARSE_STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.logger.warning("⚠️ Остановка: текущий парсинг прерван, часть уведомлений не отправлена")
+    
+    async def periodic_parse(self):
+        """
+        Периодический парсинг
+        
+        Пока автопарсинг выключен, задача ждёт события: выключение во время паузы
+        отменяет следующий запуск, а включение не порождает параллельный цикл.
+        """
+        try:
+            while True:
+                await self._parse_enabled.wait()
+                
                 try:
                     self.logger.info("🔄 Запуск автоматического парсинга...")
                     new_orders = await self.parse_and_notify()
                     if new_orders:
-                        self.logger.info(f"✅ Найдено {len(new_orders)} новых заказов")
+                        self.logger.info("✅ Найдено %d новых заказов", len(new_orders))
                     else:
                         self.logger.info("ℹ️ Новых заказов не найдено")
                 except Exception as e:
-                    self.logger.error(f"❌ Ошибка при автопарсинге: {str(e)}")
+                    self.logger.error("❌ Ошибка при автопарсинге: %s", e)
                 
                 # Ждём интервал перед следующим парсингом
                 await asyncio.sleep(PARSE_INTERVAL)
-        
-        # Запускаем периодический парсинг как задачу
-        asyncio.create_task(periodic_parse())
+        except asyncio.CancelledError:
+            self.logger.info("⏹️ Автопарсинг остановлен")
+            raise
     
     async def run(self):
         """Запуск бота"""
         self.logger.info("🚀 Запуск Freelance Parser Bot (Простая версия)...")
         
-        # Запуск автопарсинга, если он включён
-        if self.is_parsing_active:
-            self.schedule_parsing()
-        
-        # Запуск бота
-        await self.application.initialize()
-        await self.application.start()
-        await self.application.updater.start_polling()
-        
-        self.logger.info("✅ Бот успешно запущен!")
+        # Одна сессия на всё время работы: keep-alive соединения и DNS кэш переиспользуются
+        # между циклами парсинга вместо нового TCP/TLS соединения на каждый парсинг
+        self.http_session = aiohttp.ClientSession(
+            headers={'User-Agent': USER_AGENT},
+            cookies=COOKIES,
+            connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300, keepalive_timeout=60)
+        )
+        self.parser.session = self.http_session
         
-        # Ожидание завершения
         try:
-            await self.application.updater.idle()
-        except AttributeError:
-            import signal
-            stop_event = asyncio.Event()
+            # Запуск бота
+            await self.application.initialize()
+            await self.application.start()
+            
+            # Задача автопарсинга запускается всегда и ждёт, пока автопарсинг не включат.
+            # Событие создаётся до приёма обновлений: /toggle сразу после запуска уже может его менять
+            self._parse_enabled = asyncio.Event()
+            if self.is_parsing_active:
+                self._parse_enabled.set()
+            self.schedule_parsing()
+            
+            if WEBHOOK_URL:
+                # Telegram сам присылает обновления на HTTPS адрес: нет постоянного getUpdates
+                # и повторной доставки при медленной обработке. Токен в пути скрывает адрес от посторонних.
+                await self.application.updater.start_webhook(
+                    listen='0.0.0.0',
+                    port=WEBHOOK_PORT,
+                    url_path=TELEGRAM_BOT_TOKEN,
+                    webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{TELEGRAM_BOT_TOKEN}"
+                )
+                self.logger.info("🌐 Режим webhook: %s (порт %d)", WEBHOOK_URL, WEBHOOK_PORT)
+            else:
+                await self.application.updater.start_polling()
             
-            def signal_handler():
-                stop_event.set()
+            self.logger.info("✅ Бот успешно запущен!")
             
+            # Ожидание сигнала завершения (в PTB 20+ у Updater нет idle())
+            self._stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            installed = []
             for sig in (signal.SIGTERM, signal.SIGINT):
-                signal.signal(sig, lambda s, f: signal_handler())
+                try:
+                    loop.add_signal_handler(sig, self._stop_event.set)
+                    installed.append(sig)
+                except NotImplementedError:
+                    # Windows: обработчики сигналов в цикле событий не поддерживаются
+                    signal.signal(sig, lambda s, f: loop.call_soon_threadsafe(self._stop_event.set))
+            
+            try:
+                await self._stop_event.wait()
+            finally:
+                for sig in installed:
+                    loop.remove_signal_handler(sig)
             
-            await stop_event.wait()
+            self.logger.info("🛑 Остановка бота...")
+            await self.application.updater.stop()  # Новые /parse больше не приходят
+            await self.stop_parsing()
+            await self.application.stop()
+            await self.application.shutdown()
+        finally:
+            self.parser.session = None
+            await self.http_session.close()
 
 def main():
     """Главная функция запуска"""
+    # Настройка логирования (один раз для всего приложения, включая парсеры).
+    # Логгеры только кладут записи в очередь, а форматирование и вывод в консоль
+    # выполняет фоновый поток - запись логов не задерживает цикл событий
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, console)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    listener.start()
+    
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     bot = FreelanceParserBotSimple()
     
     try:
@@ -395,6 +675,8 @@ def main():
         print("\n🛑 Остановка бота...")
     except Exception as e:
         print(f"❌ Критическая ошибка: {str(e)}")
+    finally:
+        listener.stop()  # Дописывает оставшиеся в очереди записи
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Тесты ранней остановки чтения страницы списка FL.ru (FLParser._read_listing)
+"""
+
+import asyncio
+import unittest
+
+from parsers.fl_parser import FLParser, _parse_html
+
+CARD = """<div class="b-post" id="project-item{n}">
+ <h2 class="b-post__title"><a href="/projects/{n}/order-{n}/">Заказ {n}</a></h2>
+ <div class="b-post__price">{n} 000 ₽</div>
+ <div class="b-post__body"><div class="b-post__txt">Описание заказа номер {n}.</div></div>
+ <div class="b-post__foot"><span class="b-post__user">Автор {n}</span><span class="b-post__time">{n} минут назад</span></div>
+</div>
+"""
+
+LISTING = ("<html><body>\n"
+           + "".join(CARD.format(n=n) for n in range(1, 6))
+           + "</body></html>").encode('utf-8')
+
+class _Content:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def iter_chunked(self, size):
+        for chunk in self.chunks:
+            yield chunk
+
+class _Response:
+    """Ответ aiohttp, отдающий тело заранее заданными кусками"""
+    def __init__(self, chunks):
+        self.content = _Content(chunks)
+
+class ReadListingTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = FLParser('test-agent')
+
+    def _orders(self, html: bytes, max_orders: int):
+        return self.parser._parse_listing(_parse_html(html, 'utf-8'), 'parsed_at', max_orders)
+
+    def _read(self, chunks, max_orders: int) -> bytes:
+        return asyncio.run(self.parser._read_listing(_Response(chunks), max_orders))
+
+    def test_split_at_every_offset(self):
+        for max_orders in (1, 3, 5):
+            expected = self._orders(LISTING, max_orders)
+            self.assertEqual(len(expected), max_orders)
+            for offset in range(1, len(LISTING)):
+                with self.subTest(max_orders=max_orders, offset=offset):
+                    body = self._read([LISTING[:offset], LISTING[offset:]], max_orders)
+                    self.assertEqual(self._orders(body, max_orders), expected)
+
+    def test_small_chunks(self):
+        expected = self._orders(LISTING, 5)
+        for size in (1, 7, 13, 64):
+            with self.subTest(size=size):
+                chunks = [LISTING[i:i + size] for i in range(0, len(LISTING), size)]
+                self.assertEqual(self._orders(self._read(chunks, 5), 5), expected)
+
+    def test_stops_before_end(self):
+        chunks = [LISTING[i:i + 64] for i in range(0, len(LISTING), 64)]
+        self.assertLess(len(self._read(chunks, 1)), len(LISTING))
+
+if __name__ == '__main__':
+    unittest.main()
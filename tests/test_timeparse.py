@@ -0,0 +1,44 @@
+"""
+Тесты разбора времени публикации (parsers.timeparse.time_to_minutes)
+"""
+
+import unittest
+
+from parsers.timeparse import time_to_minutes
+
+CASES = (
+    ('', 0),
+    ('Недавно', 0),
+    ('только что', 0),
+    ('30 секунд назад', 1),
+    ('150 секунд назад', 2),
+    ('5 минут назад', 5),
+    ('1 минуту назад', 1),
+    ('1 час назад', 60),
+    ('2 часа назад', 120),
+    ('1 день назад', 24 * 60),
+    ('3 дня назад', 3 * 24 * 60),
+    ('5 дней назад', 5 * 24 * 60),
+    ('2 недели назад', 2 * 7 * 24 * 60),
+    ('1 месяц назад', 30 * 24 * 60),
+    ('5 Минут Назад', 5),
+    # Нестандартные строки: единица ищется подстрокой, первая по порядку побеждает
+    ('5 мин. назад', 0),
+    ('1 мес назад', 0),
+    ('1 час 20 минут назад', 1),
+    ('Сегодня в 12:30', 12 * 24 * 60),
+)
+
+class TimeToMinutesTest(unittest.TestCase):
+    def test_cases(self):
+        for time_str, minutes in CASES:
+            with self.subTest(time_str=time_str):
+                self.assertEqual(time_to_minutes(time_str), minutes)
+
+    def test_shared_by_parsers(self):
+        from parsers import combined_parser, freelancespace_parser_simple
+        self.assertIs(combined_parser.time_to_minutes, time_to_minutes)
+        self.assertIs(freelancespace_parser_simple.time_to_minutes, time_to_minutes)
+
+if __name__ == '__main__':
+    unittest.main()